@@ -1,4 +1,4 @@
-from .models import FavoriteScene
+from .utils.favorites import session_favorites
 
 
 def favorites_context(request):
@@ -6,8 +6,6 @@ def favorites_context(request):
     if not request.session.session_key:
         return {'total_favorites': 0}
     
-    total_favorites = FavoriteScene.objects.filter(
-        session_key=request.session.session_key
-    ).count()
+    total_favorites = session_favorites.for_request(request).count
     
-    return {'total_favorites': total_favorites}
\ No newline at end of file
+    return {'total_favorites': total_favorites}
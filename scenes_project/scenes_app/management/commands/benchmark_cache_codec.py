@@ -0,0 +1,101 @@
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from scenes_project.scenes_app.models import Scene
+from scenes_project.scenes_app.utils.cache_codec import CODECS, COMPRESSIONS, CacheCodec, ZlibCompression, cache_codec
+from scenes_project.scenes_app.utils.cache_warming import cache_warmer
+from scenes_project.scenes_app.utils.cached_analytics import cached_analytics
+from scenes_project.scenes_app.utils.scene_cards import card_queryset
+import json
+import time
+import zlib
+
+
+class DjangoRedisJSON:
+    """The previous cache setup: django-redis JSONSerializer plus ZlibCompressor"""
+
+    name = 'django-redis json+zlib'
+
+    def dumps(self, value):
+        data = json.dumps(value, cls=DjangoJSONEncoder).encode()
+        return zlib.compress(data, 6) if len(data) > 15 else data
+
+    def loads(self, data):
+        try:
+            data = zlib.decompress(data)
+        except zlib.error:
+            pass
+        return json.loads(data)
+
+
+class Command(BaseCommand):
+    help = 'Compare encode/decode time and size of the cache codecs on real analytics, search and listing payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Encode/decode rounds per payload and codec (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+
+        if not Scene.objects.exists():
+            self.stdout.write(self.style.ERROR('No scenes found in database!'))
+            return
+
+        codecs = [DjangoRedisJSON()]
+        for codec in CODECS:
+            for compression in COMPRESSIONS:
+                if not (codec.available and compression.available):
+                    continue
+                if isinstance(compression, ZlibCompression):
+                    # Fastest and default level, for the size/speed trade-off
+                    codecs.append(CacheCodec(codec.name, compression.name, compression_level=1))
+                    codecs.append(CacheCodec(codec.name, compression.name, compression_level=6))
+                else:
+                    codecs.append(CacheCodec(codec.name, compression.name))
+
+        self.stdout.write(f'Configured codec: {cache_codec.name}')
+        self.stdout.write(f'{iterations} rounds per payload; times are per value\n')
+
+        for label, payload in self._payloads():
+            # Values must come back as the JSON round trip returned them before
+            expected = json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  {'codec':<24} {'bytes':>9} {'encode ms':>10} {'decode ms':>10}  same")
+            for codec in codecs:
+                data, encode_ms = self._time(codec.dumps, payload, iterations)
+                value, decode_ms = self._time(codec.loads, data, iterations)
+                self.stdout.write(
+                    f"  {codec.name:<24} {len(data):>9} {encode_ms:>10.3f} {decode_ms:>10.3f}  "
+                    f"{'yes' if value == expected else 'NO'}"
+                )
+            self.stdout.write('')
+
+        self.stdout.write(self.style.SUCCESS('Cache codec benchmark completed!'))
+
+    def _payloads(self):
+        """(label, value) for the kinds of values the analytics, search and listing caches hold"""
+        def strip(data):
+            return {key: value for key, value in data.items() if key != 'cache_info'}
+
+        yield 'analytics (unfiltered)', strip(cached_analytics.analyze_scenes_cached())
+
+        filter_sets = cache_warmer.combinations(limit=2)
+        if len(filter_sets) > 1:
+            filters = filter_sets[1]
+            yield f'analytics {filters}', strip(cached_analytics.analyze_scenes_cached(filters=filters))
+
+        scenes = Scene.objects.order_by('-id')
+        yield 'search page (100 scenes)', {
+            'scenes': list(card_queryset(scenes, details=False, favorite_count=True)[:100]),
+        }
+        yield 'listing page rows (100 scenes)', list(card_queryset(scenes)[:100])
+
+    def _time(self, function, argument, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = function(argument)
+        return result, (time.perf_counter() - start) * 1000 / iterations
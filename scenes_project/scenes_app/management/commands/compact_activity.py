@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from scenes_project.scenes_app.utils.activity_rollups import activity_rollups
+import time
+
+
+class Command(BaseCommand):
+    help = 'Backfill favorite/search activity rollups and drop expired hourly buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-backfill',
+            action='store_true',
+            help='Only drop expired hourly buckets, without recounting from raw events',
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+
+        if not options['no_backfill']:
+            self.stdout.write('Backfilling activity rollups from favorites and searches...')
+            written = activity_rollups.backfill()
+            self.stdout.write(f'Wrote {written} hourly/daily buckets')
+
+        removed = activity_rollups.compact()
+        self.stdout.write(
+            f'Removed {removed} hourly buckets older than {activity_rollups.hourly_retention.days} days'
+        )
+
+        elapsed_time = time.time() - start_time
+        self.stdout.write(
+            self.style.SUCCESS(f'Activity compaction completed in {elapsed_time:.2f} seconds')
+        )
@@ -1,6 +1,10 @@
 from django.core.management.base import BaseCommand
-from django.core.cache import cache
+from ...utils.analytics_aggregates import analytics_aggregates
+from ...utils.cache_stats import cache_stats
+from ...utils.cache_warming import cache_warmer
 from ...utils.cached_analytics import cached_analytics
+from ...utils.data_sync import scene_file_sync
+from ...utils.tiered_cache import tiered_cache
 
 class Command(BaseCommand):
     help = 'Manage analytics cache'
@@ -16,10 +20,54 @@ class Command(BaseCommand):
             action='store_true',
             help='Warm up the cache with fresh data'
         )
+        parser.add_argument(
+            '--filter',
+            action='append',
+            default=[],
+            metavar='NAME=VALUE',
+            help='Warm the filtered analytics entry the API uses for these filters (repeatable)'
+        )
+        parser.add_argument(
+            '--all-filters',
+            action='store_true',
+            help='With --warm, warm every country/setting/emotion/ageRange combination that matches scenes'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=0,
+            help='With --all-filters, only warm the N combinations matching the most scenes'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='With --all-filters, entries computed at once (default ANALYTICS_WARM_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--rebuild-aggregates',
+            action='store_true',
+            help='Recount the maintained analytics aggregates from the database'
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Compare scenes.json with the database and list differing titles'
+        )
         parser.add_argument(
             '--stats',
             action='store_true',
-            help='Show cache statistics'
+            help='Show hit/miss, regeneration and payload statistics per cache namespace'
+        )
+        parser.add_argument(
+            '--count-keys',
+            action='store_true',
+            help='With --stats, also count each namespace\'s keys in Redis (scans the keyspace)'
+        )
+        parser.add_argument(
+            '--reset-stats',
+            action='store_true',
+            help='Zero the cache statistics counters'
         )
 
     def handle(self, *args, **options):
@@ -29,23 +77,94 @@ class Command(BaseCommand):
                 self.style.SUCCESS('✅ Analytics cache cleared')
             )
         
-        if options['warm']:
+        if options['rebuild_aggregates']:
+            self.stdout.write('🔢 Rebuilding analytics aggregates...')
+            counter_count = analytics_aggregates.rebuild()
+            # Payloads computed before seeding came from the fallback backend
+            cached_analytics.invalidate_cache('full_analytics')
+            self.stdout.write(
+                self.style.SUCCESS(f'✅ Rebuilt {counter_count} analytics counters')
+            )
+        
+        if options['warm'] and options['all_filters']:
+            filter_sets = cache_warmer.combinations(options['limit'])
+            concurrency = options['concurrency'] or cache_warmer.concurrency
+            self.stdout.write(
+                f'🔥 Warming {len(filter_sets)} analytics filter combinations ({concurrency} at a time)...'
+            )
+            step = max(1, len(filter_sets) // 10)
+
+            def progress(done, total):
+                if done % step == 0 or done == total:
+                    self.stdout.write(f'  {done}/{total}')
+
+            result = cache_warmer.warm(filter_sets, concurrency, progress)
+            style = self.style.SUCCESS if not result['failed'] else self.style.WARNING
+            self.stdout.write(style(
+                f"✅ Warmed {result['total']} entries in {result['elapsed']:.2f}s "
+                f"({result['per_second'] or 0:.1f}/s): {result['computed']} computed, "
+                f"{result['cached']} already cached, {result['failed']} failed"
+            ))
+        elif options['warm']:
             self.stdout.write('🔥 Warming up analytics cache...')
-            # Generate fresh analytics data
-            analytics_data = cached_analytics.analyze_scenes_cached()
+            # Same parameters as analytics_api, so workers hit the warmed entry
+            filters = dict(item.split('=', 1) for item in options['filter'] if '=' in item)
+            analytics_data = cached_analytics.analyze_scenes_cached(
+                limit_charts=0,
+                filters=filters or None
+            )
             if analytics_data.get('error'):
                 self.stdout.write(
                     self.style.ERROR(f'❌ Error warming cache: {analytics_data["error"]}')
                 )
             else:
+                cache_key = analytics_data.get('cache_info', {}).get('cache_key', 'live aggregates')
                 self.stdout.write(
-                    self.style.SUCCESS('✅ Analytics cache warmed up')
+                    self.style.SUCCESS(f'✅ Analytics cache warmed up ({cache_key})')
                 )
         
+        if options['sync']:
+            status = scene_file_sync.status(wait=True)
+            if status.get('error'):
+                self.stdout.write(self.style.ERROR(f"❌ Sync check failed: {status['error']}"))
+            else:
+                style = self.style.SUCCESS if status['synced'] else self.style.WARNING
+                self.stdout.write(style(
+                    f"🔄 Database: {status['db_count']} scenes, scenes.json: {status['json_count']} scenes"
+                ))
+                for label, key in (('Missing from database', 'missing'), ('Not in scenes.json', 'extra')):
+                    if status[f'{key}_count']:
+                        self.stdout.write(f"{label} ({status[f'{key}_count']}):")
+                        for title in status[f'{key}_titles']:
+                            self.stdout.write(f"  - {title}")
+        
         if options['stats']:
-            try:
-                # Try to get cache stats
-                cache_stats = cache._cache.get_stats()
-                self.stdout.write(f"📊 Cache Statistics: {cache_stats}")
-            except:
-                self.stdout.write("📊 Cache statistics not available")
\ No newline at end of file
+            self.stdout.write('📊 Cache statistics:')
+            report = cache_stats.report(tiered_cache.namespaces(), count_keys=options['count_keys'])
+            for name, stats in report.items():
+                hit_rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else 'n/a'
+                keys = []
+                if options['count_keys']:
+                    keys.append(f"{self._or_na(stats['redis_keys'])} keys")
+                if stats['local']:
+                    keys.append(f"{stats['local_keys']} in memory")
+                self.stdout.write(f"  {name} (generation {', '.join([str(stats['generation'])] + keys)})")
+                self.stdout.write(
+                    f"    lookups {stats['lookups']}: {stats['memory_hits']} memory, "
+                    f"{stats['redis_hits']} redis, {stats['misses']} misses (hit rate {hit_rate})"
+                )
+                self.stdout.write(
+                    f"    served stale {stats['stale_served']}, previous {stats['previous_served']}, "
+                    f"after waiting {stats['waited']}"
+                )
+                self.stdout.write(
+                    f"    regenerations {stats['regenerations']} (avg {self._or_na(stats['avg_regeneration_ms'])} ms), "
+                    f"stores {stats['stores']} (avg {self._or_na(stats['avg_payload_bytes'])} bytes)"
+                )
+
+        if options['reset_stats']:
+            cache_stats.reset(tiered_cache.namespaces())
+            self.stdout.write(self.style.SUCCESS('✅ Cache statistics reset'))
+
+    def _or_na(self, value):
+        return value if value is not None else 'n/a'
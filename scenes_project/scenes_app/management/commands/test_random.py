@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from scenes_project.scenes_app.models import Scene
-import random
+from scenes_project.scenes_app.utils.random_scenes import random_scenes
 
 
 class Command(BaseCommand):
@@ -28,16 +28,13 @@ class Command(BaseCommand):
         self.stdout.write(f"\nGetting {count} random scenes:")
         self.stdout.write("-" * 50)
         
-        # Get random scenes using the same logic as the view
-        scene_ids = list(Scene.objects.values_list('id', flat=True))
-        
+        # Get random scenes using the same service as the views
         for i in range(min(count, total_scenes)):
-            random_id = random.choice(scene_ids)
-            scene = Scene.objects.get(id=random_id)
+            scene = random_scenes.random_scene()
             
-            self.stdout.write(f"{i+1}. ID: {scene.id} - {scene.title}")
-            self.stdout.write(f"   Country: {scene.country}, Setting: {scene.setting}, Emotion: {scene.emotion}")
-            self.stdout.write(f"   Ages: {scene.effeminate_age}/{scene.masculine_age}")
+            self.stdout.write(f"{i+1}. ID: {scene['id']} - {scene['title']}")
+            self.stdout.write(f"   Country: {scene['country']}, Setting: {scene['setting']}, Emotion: {scene['emotion']}")
+            self.stdout.write(f"   Ages: {scene['effeminate_age']}/{scene['masculine_age']}")
             self.stdout.write("")
         
         self.stdout.write(self.style.SUCCESS("Random scene test completed!"))
\ No newline at end of file
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2025-08-20 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scenes_app', '0004_sceneimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=50)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['dimension', '-count'],
+                'unique_together': {('dimension', 'value')},
+            },
+        ),
+    ]
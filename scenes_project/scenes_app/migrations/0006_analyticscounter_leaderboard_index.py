@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2025-08-21 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scenes_app', '0005_analyticscounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticscounter',
+            index=models.Index(fields=['dimension', '-count'], name='scenes_app__dimensi_476804_idx'),
+        ),
+    ]
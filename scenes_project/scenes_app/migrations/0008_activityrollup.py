@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2025-08-23 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scenes_app', '0006_analyticscounter_leaderboard_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('favorite_added', 'Favorite added'), ('favorite_removed', 'Favorite removed'), ('search', 'Search')], max_length=20)),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['metric', 'period', 'bucket'],
+                'unique_together': {('metric', 'period', 'bucket')},
+            },
+        ),
+    ]
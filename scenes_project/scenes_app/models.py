@@ -50,6 +50,11 @@ class Scene(models.Model):
         """Get all images for this scene"""
         return self.scene_images.all().order_by('order', 'uploaded_at')
     
+    @property
+    def image_count(self):
+        """Number of images attached to this scene"""
+        return self.scene_images.count()
+    
     @property
     def primary_image(self):
         """Get the primary image for this scene"""
@@ -468,3 +473,49 @@ class SceneImage(models.Model):
             return self.original_image.url
         
         return None
+
+
+class AnalyticsCounter(models.Model):
+    """Delta-maintained analytics total for one (dimension, value) pair"""
+    dimension = models.CharField(max_length=50)
+    value = models.CharField(max_length=255, blank=True)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('dimension', 'value')
+        ordering = ['dimension', '-count']
+        indexes = [
+            # Leaderboard reads: highest counts within one dimension
+            models.Index(fields=['dimension', '-count']),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.value!r}: {self.count}"
+
+
+class ActivityRollup(models.Model):
+    """Event count for one metric in one hourly or daily bucket"""
+    METRICS = [
+        ('favorite_added', 'Favorite added'),
+        ('favorite_removed', 'Favorite removed'),
+        ('search', 'Search'),
+    ]
+    PERIODS = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRICS)
+    period = models.CharField(max_length=4, choices=PERIODS)
+    bucket = models.DateTimeField()  # Start of the hour or day
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('metric', 'period', 'bucket')
+        ordering = ['metric', 'period', 'bucket']
+
+    def __str__(self):
+        return f"{self.metric} {self.period} {self.bucket:%Y-%m-%d %H:00}: {self.count}"
+
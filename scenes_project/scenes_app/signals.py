@@ -5,29 +5,140 @@ import re
 from collections import Counter
 import logging
 import os
+import threading
 from django.conf import settings
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Scene, FavoriteScene
+from .models import Scene, FavoriteScene, SearchQuery
+from .utils.activity_rollups import activity_rollups
+from .utils.analytics_aggregates import analytics_aggregates
+from .utils.analytics_engine import ENGINE_COLUMNS
 from .utils.cached_analytics import cached_analytics
+from .utils.cache_namespaces import listing_cache, search_cache
+from .utils.cache_versions import cache_versions
+from .utils.favorites import session_favorites
 
 logger = logging.getLogger(__name__)
 
+# Scene ids being deleted in this thread; their cascaded favorites are not user removals
+_deleting_scenes = threading.local()
+
+
+@receiver(pre_save, sender=Scene)
+def remember_scene_analytics_row(sender, instance, **kwargs):
+    """Keep the stored values of an edited scene so analytics can apply the difference"""
+    instance._analytics_row = None
+    if instance.pk:
+        instance._analytics_row = Scene.objects.filter(pk=instance.pk).values(*ENGINE_COLUMNS).first()
+
 
 @receiver(post_save, sender=Scene)
+def update_analytics_on_scene_save(sender, instance, **kwargs):
+    """Move the analytics aggregates from the scene's old values to its new ones"""
+    new_row = {column: getattr(instance, column) for column in ENGINE_COLUMNS}
+    old_row = getattr(instance, '_analytics_row', None)
+    if old_row == new_row:
+        # Nothing analytics reads was changed
+        return
+    analytics_aggregates.scene_changed(old_row, new_row)
+    # Unfiltered, filtered and comparison payloads all count the scene
+    cached_analytics.invalidate_cache('all')
+
+
 @receiver(post_delete, sender=Scene)
-def invalidate_analytics_cache_on_scene_change(sender, **kwargs):
-    """Invalidate analytics cache when scenes are added/updated/deleted"""
+def update_analytics_on_scene_delete(sender, instance, **kwargs):
+    """Remove a deleted scene from the analytics aggregates"""
+    old_row = {column: getattr(instance, column) for column in ENGINE_COLUMNS}
+    analytics_aggregates.scene_changed(old_row, None)
     cached_analytics.invalidate_cache('all')
-    print("🗑️ Analytics cache invalidated due to scene change")
 
 
 @receiver(post_save, sender=FavoriteScene)
+def update_analytics_on_favorite_save(sender, instance, created, **kwargs):
+    """Count a new favorite in the analytics aggregates"""
+    if created:
+        analytics_aggregates.favorite_changed(instance.scene_id, 1)
+        # Every analytics payload shows favorite totals, so each namespace moves on
+        cached_analytics.invalidate_cache('all')
+
+
 @receiver(post_delete, sender=FavoriteScene)
-def invalidate_analytics_cache_on_favorite_change(sender, **kwargs):
-    """Invalidate analytics cache when favorites change"""
+def update_analytics_on_favorite_delete(sender, instance, **kwargs):
+    """Drop a removed favorite from the analytics aggregates"""
+    analytics_aggregates.favorite_changed(instance.scene_id, -1)
     cached_analytics.invalidate_cache('all')
-    print("🗑️ Analytics cache invalidated due to favorite change")
+
+
+@receiver(post_delete, sender=FavoriteScene)
+def invalidate_session_favorites_on_delete(sender, instance, **kwargs):
+    """Drop the cached favorites of the session, also when a scene delete cascades"""
+    session_favorites.invalidate(instance.session_key)
+
+
+@receiver(post_save, sender=FavoriteScene)
+def record_favorite_added(sender, instance, created, **kwargs):
+    """Count a new favorite in the activity rollups"""
+    if created:
+        activity_rollups.record('favorite_added', instance.created_at)
+
+
+@receiver(pre_delete, sender=Scene)
+def remember_deleting_scene(sender, instance, **kwargs):
+    """Mark a scene whose favorites are about to be removed by the delete cascade"""
+    if not hasattr(_deleting_scenes, 'ids'):
+        _deleting_scenes.ids = set()
+    _deleting_scenes.ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Scene)
+def forget_deleting_scene(sender, instance, **kwargs):
+    getattr(_deleting_scenes, 'ids', set()).discard(instance.pk)
+
+
+@receiver(post_delete, sender=FavoriteScene)
+def record_favorite_removed(sender, instance, **kwargs):
+    """Count a removed favorite in the activity rollups, unless a scene delete cascaded to it"""
+    if instance.scene_id in getattr(_deleting_scenes, 'ids', ()):
+        return
+    activity_rollups.record('favorite_removed')
+
+
+@receiver(post_save, sender=SearchQuery)
+def record_search(sender, instance, created, **kwargs):
+    """Count a logged search in the activity rollups"""
+    if created:
+        activity_rollups.record('search', instance.created_at)
+
+
+@receiver(post_save, sender=Scene)
+@receiver(post_delete, sender=Scene)
+@receiver(post_save, sender=SceneImage)
+@receiver(post_delete, sender=SceneImage)
+def bump_scenes_version_on_change(sender, **kwargs):
+    """Advance the corpus version used by ETags when scenes or their images change"""
+    cache_versions.bump('scenes')
+
+
+@receiver(post_save, sender=FavoriteScene)
+@receiver(post_delete, sender=FavoriteScene)
+def bump_favorites_version_on_change(sender, **kwargs):
+    """Advance the global favorites version used by ETags that show favorite counts"""
+    cache_versions.bump('favorites')
+
+
+@receiver(post_save, sender=Scene)
+@receiver(post_delete, sender=Scene)
+def invalidate_listing_caches_on_scene_change(sender, **kwargs):
+    """Orphan cached listing pages and search results when scenes change"""
+    listing_cache.invalidate()
+    search_cache.invalidate()
+
+
+@receiver(post_save, sender=FavoriteScene)
+@receiver(post_delete, sender=FavoriteScene)
+def invalidate_search_cache_on_favorite_change(sender, **kwargs):
+    """Orphan cached search results, which carry favorite counts"""
+    search_cache.invalidate()
 
 
 @receiver(post_save, sender=Scene)
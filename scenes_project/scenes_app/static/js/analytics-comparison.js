@@ -24,6 +24,9 @@ class AnalyticsComparison {
           <button id="save-snapshot" class="text-sm bg-blue-600 text-white px-3 py-1 rounded hover:bg-blue-700 transition-colors">
             Save Current View
           </button>
+          <button id="refresh-comparisons" class="text-sm text-gray-600 hover:text-gray-900 transition-colors">
+            Refresh
+          </button>
           <button id="clear-comparisons" class="text-sm text-gray-600 hover:text-gray-900 transition-colors">
             Clear All
           </button>
@@ -71,6 +74,10 @@ class AnalyticsComparison {
       this.saveCurrentSnapshot();
     });
 
+    document.getElementById('refresh-comparisons')?.addEventListener('click', () => {
+      this.refreshSnapshots();
+    });
+
     document.getElementById('clear-comparisons')?.addEventListener('click', () => {
       this.clearAllComparisons();
     });
@@ -90,7 +97,7 @@ class AnalyticsComparison {
     const snapshot = {
       id: Date.now(),
       timestamp: new Date().toLocaleString(),
-      data: JSON.parse(JSON.stringify(this.dashboard.analyticsData)),
+      data: { stats: JSON.parse(JSON.stringify(this.dashboard.analyticsData.stats || {})) },
       filters: this.dashboard.filters ? JSON.parse(JSON.stringify(this.dashboard.filters.filters)) : {},
       label: this.generateSnapshotLabel()
     };
@@ -102,6 +109,31 @@ class AnalyticsComparison {
     showToast('Snapshot saved successfully!', 'success');
   }
 
+  async refreshSnapshots() {
+    // Snapshots are point-in-time; on request, recompute every side in one batch
+    const snapshots = this.comparisonData.slice();
+    if (snapshots.length === 0) return;
+
+    const sets = encodeURIComponent(JSON.stringify(snapshots.map(snapshot => snapshot.filters)));
+    try {
+      const response = await fetch(`/api/analytics/compare/?sets=${sets}`);
+      const data = await response.json();
+      if (!response.ok || data.error) {
+        throw new Error(data.error || `HTTP ${response.status}`);
+      }
+
+      const timestamp = new Date().toLocaleString();
+      data.comparisons.forEach((comparison, index) => {
+        snapshots[index].data.stats = comparison.stats;
+        snapshots[index].timestamp = timestamp;
+      });
+      this.renderSnapshots();
+      this.updateComparisonCharts();
+    } catch (error) {
+      console.error('Error refreshing comparisons:', error);
+    }
+  }
+
   generateSnapshotLabel() {
     const activeFilters = this.dashboard.filters ? this.dashboard.filters.getActiveFilters() : [];
     if (activeFilters.length === 0) {
@@ -198,6 +198,12 @@ class AnalyticsDashboard {
     // Update most favorited scenes
     this.updateMostFavorited(data.most_favorited || []);
 
+    // Update activity totals from the hourly/daily rollups
+    const activityTotals = (data.recent_activity && data.recent_activity.totals) || {};
+    this.updateElement('activity-favorites-today', (activityTotals.favorite_added || {}).today || 0);
+    this.updateElement('activity-favorites-week', (activityTotals.favorite_added || {}).this_week || 0);
+    this.updateElement('activity-searches-today', (activityTotals.search || {}).today || 0);
+
     // Update insights with null checks
     if (data.charts && data.charts.countries && data.charts.countries.labels && data.charts.countries.labels.length > 0) {
       this.updateElement('popular-country', data.charts.countries.labels[0]);
@@ -430,29 +436,39 @@ class AnalyticsDashboard {
       });
     }
 
-    // Create age ranges chart with fallback support
+    // Create age range charts with fallback support
+    this.createAgeRangesChart('age-ranges', data, 'age_ranges', this.colorSchemes.primary[0]);
+    this.createAgeRangesChart('masculine-age-ranges', data, 'masculine_age_ranges', this.colorSchemes.primary[1]);
+
+    // Daily favorite and search trends
+    this.createActivityChart(data.recent_activity);
+
+    console.log('Charts created:', Object.keys(this.charts));
+  }
+
+  createAgeRangesChart(chartName, data, key, color) {
     let ageLabels = [];
     let ageData = [];
     
-    if (data.charts && data.charts.age_ranges && data.charts.age_ranges.labels) {
-      ageLabels = data.charts.age_ranges.labels;
-      ageData = data.charts.age_ranges.data;
-    } else if (data.age_ranges && typeof data.age_ranges === 'object') {
-      ageLabels = Object.keys(data.age_ranges);
-      ageData = Object.values(data.age_ranges);
+    if (data.charts && data.charts[key] && data.charts[key].labels) {
+      ageLabels = data.charts[key].labels;
+      ageData = data.charts[key].data;
+    } else if (data[key] && typeof data[key] === 'object') {
+      ageLabels = Object.keys(data[key]);
+      ageData = Object.values(data[key]);
     }
     
     if (ageLabels.length > 0) {
-      console.log('Creating age ranges chart with labels:', ageLabels);
-      this.charts['age-ranges'] = this.createChart('age-ranges-chart', {
+      console.log(`Creating ${chartName} chart with labels:`, ageLabels);
+      this.charts[chartName] = this.createChart(chartName + '-chart', {
         type: 'bar',
         data: {
           labels: ageLabels,
           datasets: [{
             label: 'Number of Scenes',
             data: ageData,
-            backgroundColor: this.colorSchemes.primary[0],
-            borderColor: this.colorSchemes.primary[0],
+            backgroundColor: color,
+            borderColor: color,
             borderWidth: 1
           }]
         },
@@ -460,8 +476,8 @@ class AnalyticsDashboard {
       });
     } else {
       // Create empty chart with "No data" message
-      console.log('Creating empty age ranges chart - no data available');
-      this.charts['age-ranges'] = this.createChart('age-ranges-chart', {
+      console.log(`Creating empty ${chartName} chart - no data available`);
+      this.charts[chartName] = this.createChart(chartName + '-chart', {
         type: 'bar',
         data: {
           labels: ['No Data'],
@@ -476,8 +492,34 @@ class AnalyticsDashboard {
         options: this.getChartOptions('bar')
       });
     }
+  }
 
-    console.log('Charts created:', Object.keys(this.charts));
+  createActivityChart(activity) {
+    const daily = activity && activity.daily;
+    if (!daily || !daily.labels) {
+      return;
+    }
+
+    const series = [
+      ['favorite_added', 'Favorites Added', this.colorSchemes.primary[3]],
+      ['favorite_removed', 'Favorites Removed', this.colorSchemes.primary[4]],
+      ['search', 'Searches', this.colorSchemes.primary[0]]
+    ];
+
+    this.charts['activity'] = this.createChart('activity-chart', {
+      type: 'line',
+      data: {
+        labels: daily.labels,
+        datasets: series.map(([key, label, color]) => ({
+          label: label,
+          data: daily.series[key] || [],
+          borderColor: color,
+          backgroundColor: color,
+          fill: false
+        }))
+      },
+      options: this.getChartOptions('line')
+    });
   }
 
   createChart(canvasId, config) {
@@ -576,7 +618,7 @@ class AnalyticsDashboard {
     }
 
     const chart = this.charts[chartName];
-    const chartData = this.analyticsData.charts[chartName.replace('-', '_')];
+    const chartData = this.analyticsData.charts[chartName.replace(/-/g, '_')];
 
     if (!chartData || !chartData.labels) {
       console.warn(`No data available for chart ${chartName}`);
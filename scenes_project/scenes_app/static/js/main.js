@@ -79,14 +79,25 @@ window.showToast = showToast;
   }
 
   // Random scene functionality
+  // Scenes are fetched in batches and handed out one per click
+  const RANDOM_BATCH_SIZE = 20;
+  let randomSceneQueue = [];
+
   async function getRandomScene() {
     try {
-      const res = await fetch('/api/random/');
-      const data = await res.json();
-      if (data.error) {
-        throw new Error(data.error);
+      if (randomSceneQueue.length === 0) {
+        const res = await fetch(`/api/random/?count=${RANDOM_BATCH_SIZE}`);
+        const data = await res.json();
+        if (data.error) {
+          throw new Error(data.error);
+        }
+        randomSceneQueue = data.scenes || [];
+      }
+      const scene = randomSceneQueue.shift();
+      if (!scene) {
+        throw new Error('No scenes available');
       }
-      return data;
+      return scene;
     } catch (err) {
       showToast('Failed to fetch random scene', 'error');
       throw err;
@@ -21,6 +21,9 @@ urlpatterns = [
     path('api/scene/<int:pk>/delete/', views.delete_scene_api, name='delete_scene_api'),
     path('analytics/', views.analytics, name='analytics'),
     path('api/analytics/', views.analytics_api, name='analytics_api'),
+    path('api/analytics/compare/', views.analytics_compare_api, name='analytics_compare_api'),
+    path('api/cache/stats/', views.cache_stats_api, name='cache_stats_api'),
+    path('api/favorites/top/', views.top_favorites_api, name='top_favorites_api'),
     # path('api/debug/', views.debug_api, name='debug_api'),
     
     # Image management URLs
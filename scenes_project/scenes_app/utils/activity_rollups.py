@@ -0,0 +1,166 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+# Metrics kept as rollups
+ACTIVITY_METRICS = ('favorite_added', 'favorite_removed', 'search')
+
+# Trend windows shown on the analytics page
+DAILY_TREND_DAYS = 30
+HOURLY_TREND_HOURS = 24
+
+
+def bucket_start(when, period):
+    """Start of the hour or day (in the current time zone) containing ``when``"""
+    when = timezone.localtime(when)
+    if period == 'day':
+        return when.replace(hour=0, minute=0, second=0, microsecond=0)
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+class ActivityRollups:
+    """
+    Hourly and daily event counts in ActivityRollup rows.
+    Signals add each favorite and search to its hour and day as it happens;
+    the compact_activity command backfills buckets from the raw event rows
+    and drops hourly buckets past their retention, leaving the daily ones.
+    """
+
+    chunk_size = 500
+
+    @property
+    def hourly_retention(self):
+        return timedelta(days=getattr(settings, 'ACTIVITY_HOURLY_RETENTION_DAYS', 7))
+
+    def record(self, metric, when=None, delta=1):
+        """Count ``delta`` events of ``metric`` in the hour and day of ``when``"""
+        from django.apps import apps
+        ActivityRollup = apps.get_model('scenes_app', 'ActivityRollup')
+
+        when = when or timezone.now()
+        with transaction.atomic():
+            for period in ('hour', 'day'):
+                lookup = {'metric': metric, 'period': period, 'bucket': bucket_start(when, period)}
+                rollup = ActivityRollup.objects.filter(**lookup)
+                if rollup.update(count=F('count') + delta):
+                    continue
+                try:
+                    with transaction.atomic():
+                        ActivityRollup.objects.create(count=delta, **lookup)
+                except IntegrityError:
+                    # Created concurrently by another worker - apply the delta to it
+                    rollup.update(count=F('count') + delta)
+
+    def backfill(self):
+        """
+        Recount buckets from FavoriteScene and SearchQuery timestamps.
+        Searches are never deleted, so their raw counts replace the rollups;
+        removed favorites no longer have rows, so additions only ever grow.
+        Removals exist only as recorded by the signals. Returns buckets written.
+        """
+        from django.apps import apps
+        from django.db.models import Count
+        from django.db.models.functions import TruncDay, TruncHour
+        ActivityRollup = apps.get_model('scenes_app', 'ActivityRollup')
+        FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+        SearchQuery = apps.get_model('scenes_app', 'SearchQuery')
+
+        hourly_cutoff = bucket_start(timezone.now() - self.hourly_retention, 'hour')
+        sources = (('favorite_added', FavoriteScene, False), ('search', SearchQuery, True))
+        written = 0
+
+        for metric, model, authoritative in sources:
+            for period, trunc in (('hour', TruncHour), ('day', TruncDay)):
+                events = model.objects.order_by()
+                if period == 'hour':
+                    events = events.filter(created_at__gte=hourly_cutoff)
+                raw_counts = (
+                    events.annotate(bucket=trunc('created_at')).values('bucket')
+                    .annotate(count=Count('id')).values_list('bucket', 'count')
+                )
+                rollups = ActivityRollup.objects.filter(metric=metric, period=period)
+                if period == 'hour':
+                    rollups = rollups.filter(bucket__gte=hourly_cutoff)
+                existing = {rollup.bucket: rollup for rollup in rollups}
+
+                to_create, to_update = [], []
+                if authoritative:
+                    # Buckets without raw events are recounted as empty
+                    raw_counts = dict.fromkeys(existing, 0) | dict(raw_counts)
+                else:
+                    raw_counts = dict(raw_counts)
+                for bucket, count in raw_counts.items():
+                    rollup = existing.get(bucket)
+                    if rollup is None and count:
+                        to_create.append(ActivityRollup(metric=metric, period=period, bucket=bucket, count=count))
+                    elif rollup is not None and rollup.count != count and (authoritative or count > rollup.count):
+                        rollup.count = count
+                        to_update.append(rollup)
+
+                with transaction.atomic():
+                    ActivityRollup.objects.bulk_create(to_create, batch_size=self.chunk_size)
+                    ActivityRollup.objects.bulk_update(to_update, ['count'], batch_size=self.chunk_size)
+                written += len(to_create) + len(to_update)
+
+        logger.info(f"Backfilled {written} activity buckets")
+        return written
+
+    def compact(self):
+        """Drop hourly buckets older than the retention window; returns rows removed"""
+        from django.apps import apps
+        ActivityRollup = apps.get_model('scenes_app', 'ActivityRollup')
+
+        cutoff = bucket_start(timezone.now() - self.hourly_retention, 'hour')
+        deleted, _ = ActivityRollup.objects.filter(period='hour', bucket__lt=cutoff).delete()
+        return deleted
+
+    def recent_activity(self, now=None):
+        """
+        Totals for today, the last 7 and the last 30 days plus daily and hourly
+        trend series for every metric, from one query over the rollups.
+        """
+        from django.apps import apps
+        from django.db.models import Q
+        ActivityRollup = apps.get_model('scenes_app', 'ActivityRollup')
+
+        now = now or timezone.now()
+        today = bucket_start(now, 'day')
+        days = [today - timedelta(days=offset) for offset in reversed(range(DAILY_TREND_DAYS))]
+        current_hour = bucket_start(now, 'hour')
+        hours = [current_hour - timedelta(hours=offset) for offset in reversed(range(HOURLY_TREND_HOURS))]
+
+        counts = {'day': Counter(), 'hour': Counter()}
+        rows = ActivityRollup.objects.filter(
+            Q(period='day', bucket__gte=days[0]) | Q(period='hour', bucket__gte=hours[0])
+        ).values_list('metric', 'period', 'bucket', 'count')
+        for metric, period, bucket, count in rows:
+            counts[period][(metric, bucket_start(bucket, period))] += count
+
+        def series(period, buckets):
+            return {metric: [counts[period][(metric, bucket)] for bucket in buckets] for metric in ACTIVITY_METRICS}
+
+        daily = series('day', days)
+        return {
+            'totals': {
+                metric: {
+                    'today': daily[metric][-1],
+                    'this_week': sum(daily[metric][-7:]),
+                    'this_month': sum(daily[metric]),
+                }
+                for metric in ACTIVITY_METRICS
+            },
+            'daily': {'labels': [day.strftime('%b %d') for day in days], 'series': daily},
+            'hourly': {'labels': [hour.strftime('%H:00') for hour in hours], 'series': series('hour', hours)},
+        }
+
+
+# Global instance
+activity_rollups = ActivityRollups()
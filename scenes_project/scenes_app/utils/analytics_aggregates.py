@@ -0,0 +1,177 @@
+from collections import Counter
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .analytics_engine import AnalyticsAccumulator, ENGINE_COLUMNS, aggregate_keys
+
+logger = logging.getLogger(__name__)
+
+
+# Marker row written by rebuild(); its absence means the table needs seeding
+BUILT_MARKER = ('_built', '')
+
+# Per-scene favorite totals are stored under this dimension, keyed by scene id
+FAVORITES_DIMENSION = 'favorites'
+
+# Largest leaderboard served by top_favorited
+MAX_LEADERBOARD_SIZE = 100
+
+
+class AnalyticsAggregates:
+    """
+    Unfiltered analytics kept as AnalyticsCounter rows.
+    Signals apply the difference between a row's old and new values, so the
+    analytics page reads live totals instead of recomputing from every scene.
+    """
+
+    chunk_size = 500
+
+    def compute(self, limit_favorites=0):
+        """
+        Unfiltered analytics sections, in the shape AnalyticsEngine.compute returns.
+        Only the ``limit_favorites`` leaders are read from the per-scene
+        favorite counters; 0 reads every favorited scene.
+        Returns None until the counters are seeded with
+        manage_analytics_cache --rebuild-aggregates: rebuilding rewrites the
+        whole table, which is no job for a request.
+        """
+        from django.apps import apps
+        from django.db.models import Sum
+        AnalyticsCounter = apps.get_model('scenes_app', 'AnalyticsCounter')
+        Scene = apps.get_model('scenes_app', 'Scene')
+
+        counts = self._load_counts(AnalyticsCounter)
+        if BUILT_MARKER not in counts:
+            return None
+
+        leaders = self._leaders(limit_favorites)
+        favorited = []
+        if leaders:
+            rows = {
+                row['id']: row
+                for row in Scene.objects.filter(id__in=[scene_id for scene_id, _ in leaders])
+                .values('id', 'title', 'country', 'setting')
+            }
+            favorited = [(count, rows[scene_id]) for scene_id, count in leaders if scene_id in rows]
+
+        accumulator = AnalyticsAccumulator.from_aggregates(counts, favorited)
+        accumulator.total_favorites = (
+            AnalyticsCounter.objects.filter(dimension=FAVORITES_DIMENSION, count__gt=0)
+            .aggregate(total=Sum('count'))['total'] or 0
+        )
+        result = accumulator.result(limit_favorites)
+        for field in ('country', 'setting', 'emotion'):
+            result[f'all_{field}_data'] = result[f'{field}_data']
+        return result
+
+    def top_favorited(self, limit=10):
+        """
+        [{'id', 'title', 'fav_count'}, ...] for the ``limit`` most favorited
+        scenes, read from the per-scene favorite counters (ties by scene id).
+        Empty until the counters are seeded with manage_analytics_cache --rebuild-aggregates.
+        """
+        from django.apps import apps
+        Scene = apps.get_model('scenes_app', 'Scene')
+
+        leaders = self._leaders(max(1, min(limit, MAX_LEADERBOARD_SIZE)))
+        titles = dict(Scene.objects.filter(id__in=[scene_id for scene_id, _ in leaders])
+                      .values_list('id', 'title'))
+        return [
+            {'id': scene_id, 'title': titles[scene_id], 'fav_count': count}
+            for scene_id, count in leaders
+            if scene_id in titles
+        ]
+
+    def scene_changed(self, old_row=None, new_row=None):
+        """Apply the counter deltas between two versions of a scene row"""
+        deltas = Counter()
+        if old_row:
+            deltas.subtract(aggregate_keys(old_row))
+        if new_row:
+            deltas.update(aggregate_keys(new_row))
+        self._apply(deltas)
+
+    def favorite_changed(self, scene_id, delta):
+        """Adjust the favorite total of a scene by ``delta``"""
+        self._apply({(FAVORITES_DIMENSION, str(scene_id)): delta})
+
+    def rebuild(self):
+        """Recount every aggregate from the scenes and favorites tables"""
+        from django.apps import apps
+        from django.db.models import Count
+        AnalyticsCounter = apps.get_model('scenes_app', 'AnalyticsCounter')
+        Scene = apps.get_model('scenes_app', 'Scene')
+        FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+
+        counts = Counter()
+        rows = Scene.objects.order_by().values(*ENGINE_COLUMNS).iterator(chunk_size=self.chunk_size)
+        for row in rows:
+            counts.update(aggregate_keys(row))
+
+        favorites = (FavoriteScene.objects.values_list('scene_id')
+                     .annotate(count=Count('id')).order_by('scene_id'))
+        for scene_id, count in favorites:
+            counts[(FAVORITES_DIMENSION, str(scene_id))] = count
+        counts[BUILT_MARKER] = 1
+
+        with transaction.atomic():
+            AnalyticsCounter.objects.all().delete()
+            AnalyticsCounter.objects.bulk_create(
+                [
+                    AnalyticsCounter(dimension=dimension, value=value, count=count)
+                    for (dimension, value), count in counts.items()
+                ],
+                batch_size=self.chunk_size,
+            )
+        logger.info(f"Rebuilt {len(counts)} analytics aggregates")
+        return len(counts)
+
+    def _load_counts(self, AnalyticsCounter):
+        # Creation order keeps ties in first-seen order, like the engine's Counters;
+        # per-scene favorite counters are read by _leaders instead
+        return {
+            (dimension, value): count
+            for dimension, value, count in AnalyticsCounter.objects.exclude(dimension=FAVORITES_DIMENSION)
+            .order_by('id').values_list('dimension', 'value', 'count')
+        }
+
+    def _leaders(self, limit=0):
+        """(scene_id, favorite_count) pairs, most favorites first (ties by id); 0 means all"""
+        from django.apps import apps
+        from django.db.models import IntegerField
+        from django.db.models.functions import Cast
+        AnalyticsCounter = apps.get_model('scenes_app', 'AnalyticsCounter')
+
+        leaders = (
+            AnalyticsCounter.objects.filter(dimension=FAVORITES_DIMENSION, count__gt=0)
+            .annotate(scene_id=Cast('value', IntegerField()))
+            .order_by('-count', 'scene_id')
+            .values_list('scene_id', 'count')
+        )
+        if limit and limit > 0:
+            leaders = leaders[:limit]
+        return list(leaders)
+
+    def _apply(self, deltas):
+        from django.apps import apps
+        AnalyticsCounter = apps.get_model('scenes_app', 'AnalyticsCounter')
+
+        with transaction.atomic():
+            for (dimension, value), delta in deltas.items():
+                if not delta:
+                    continue
+                counter = AnalyticsCounter.objects.filter(dimension=dimension, value=value)
+                if counter.update(count=F('count') + delta):
+                    continue
+                try:
+                    with transaction.atomic():
+                        AnalyticsCounter.objects.create(dimension=dimension, value=value, count=delta)
+                except IntegrityError:
+                    # Created concurrently by another worker - apply the delta to it
+                    counter.update(count=F('count') + delta)
+
+
+# Global instance
+analytics_aggregates = AnalyticsAggregates()
@@ -0,0 +1,417 @@
+from collections import Counter
+
+
+# Facets shown as charts and filter dropdowns
+DISTRIBUTION_FIELDS = ('country', 'setting', 'emotion')
+
+# Character details keys (under details.effeminate / details.masculine)
+DETAIL_FIELDS = ('appearance', 'hair', 'clothing')
+
+# Atmosphere keys (under details.atmosphere)
+ATMOSPHERE_FIELDS = ('lighting', 'scent', 'sound')
+
+# Number of values kept per details/atmosphere breakdown
+TOP_VALUES = 10
+
+# Columns streamed from the scenes table
+ENGINE_COLUMNS = (
+    'id', 'title', 'country', 'setting', 'emotion',
+    'effeminate_age', 'masculine_age', 'details',
+)
+
+
+def parse_age_range(age_range):
+    """Turn an ageRange filter ('20-29', '40+') into (min_age, max_age or None)"""
+    if '+' in age_range:
+        return int(age_range.replace('+', '')), None
+    if '-' in age_range:
+        min_age, max_age = map(int, age_range.split('-'))
+        return min_age, max_age
+    return None
+
+
+def normalize_detail(value):
+    """Lower-cased, stripped details value, or None when unusable"""
+    if not isinstance(value, str):
+        return None
+    value = value.lower().strip()
+    return value or None
+
+
+def age_histogram(age_counts):
+    """
+    Bucket an {age: count} mapping into the analytics age ranges in one pass:
+    5-year buckets when the span is 20 years or less, 10-year buckets otherwise.
+    Every age lands in bucket (age - min) // width, so the cost is one step per
+    distinct age rather than a scan per bucket.
+    """
+    if not age_counts:
+        return {}
+
+    min_age = min(age_counts)
+    max_age = max(age_counts)
+    width = 5 if max_age - min_age <= 20 else 10
+
+    buckets = [0] * ((max_age - min_age) // width + 1)
+    for age, count in age_counts.items():
+        buckets[(age - min_age) // width] += count
+
+    histogram = {}
+    for index, count in enumerate(buckets):
+        start = min_age + index * width
+        if width == 10 and start == max_age:
+            histogram[f"{start}+"] = count
+        else:
+            histogram[f"{start}-{min(start + width - 1, max_age)}"] = count
+    return histogram
+
+
+def aggregate_keys(row):
+    """
+    (dimension, value) counters a scene row contributes to the maintained
+    analytics aggregates; values are cut to the AnalyticsCounter column size.
+    """
+    keys = [('scenes', '')]
+    for field in ('effeminate_age', 'masculine_age'):
+        keys.append((field, str(row[field])))
+    for field in DISTRIBUTION_FIELDS:
+        keys.append((field, (row[field] or '')[:255]))
+
+    details = row['details']
+    if isinstance(details, dict):
+        for character in ('effeminate', 'masculine'):
+            character_details = details.get(character)
+            if not isinstance(character_details, dict):
+                continue
+            for field in DETAIL_FIELDS:
+                value = normalize_detail(character_details.get(field))
+                if value:
+                    keys.append((f'{field}.{character}', value[:255]))
+
+        atmosphere = details.get('atmosphere')
+        if isinstance(atmosphere, dict):
+            for field in ATMOSPHERE_FIELDS:
+                value = normalize_detail(atmosphere.get(field))
+                if value:
+                    keys.append((f'atmosphere.{field}', value[:255]))
+    return keys
+
+
+class AnalyticsAccumulator:
+    """Running totals for one pass over scene rows"""
+
+    def __init__(self):
+        self.total_scenes = 0
+        self.total_favorites = 0
+        self.effeminate_age_sum = 0
+        self.masculine_age_sum = 0
+        self.effeminate_ages = Counter()
+        self.masculine_ages = Counter()
+        self.distributions = {field: Counter() for field in DISTRIBUTION_FIELDS}
+        self.details = {
+            field: {'effeminate': Counter(), 'masculine': Counter()}
+            for field in DETAIL_FIELDS
+        }
+        self.atmosphere = {field: Counter() for field in ATMOSPHERE_FIELDS}
+        self.favorited = []
+
+    def add(self, row, favorite_count=0):
+        self.total_scenes += 1
+        self.total_favorites += favorite_count
+        self.effeminate_age_sum += row['effeminate_age']
+        self.masculine_age_sum += row['masculine_age']
+        self.effeminate_ages[row['effeminate_age']] += 1
+        self.masculine_ages[row['masculine_age']] += 1
+
+        for field in DISTRIBUTION_FIELDS:
+            self.distributions[field][row[field]] += 1
+
+        details = row.get('details')
+        if isinstance(details, dict):
+            for character in ('effeminate', 'masculine'):
+                character_details = details.get(character)
+                if not isinstance(character_details, dict):
+                    continue
+                for field in DETAIL_FIELDS:
+                    value = normalize_detail(character_details.get(field))
+                    if value:
+                        self.details[field][character][value] += 1
+
+            atmosphere = details.get('atmosphere')
+            if isinstance(atmosphere, dict):
+                for field in ATMOSPHERE_FIELDS:
+                    value = normalize_detail(atmosphere.get(field))
+                    if value:
+                        self.atmosphere[field][value] += 1
+
+        if favorite_count > 0:
+            self.favorited.append((favorite_count, row))
+
+    @classmethod
+    def from_aggregates(cls, counts, favorited=()):
+        """
+        Rebuild accumulator state from aggregate_keys counters.
+        ``counts`` maps (dimension, value) to a count; ``favorited`` holds
+        (favorite_count, row) pairs for scenes with favorites.
+        """
+        accumulator = cls()
+        for (dimension, value), count in counts.items():
+            if count <= 0:
+                continue
+            if dimension == 'scenes':
+                accumulator.total_scenes = count
+            elif dimension in ('effeminate_age', 'masculine_age'):
+                age = int(value)
+                getattr(accumulator, f'{dimension}s')[age] = count
+                setattr(accumulator, f'{dimension}_sum',
+                        getattr(accumulator, f'{dimension}_sum') + age * count)
+            elif dimension in accumulator.distributions:
+                accumulator.distributions[dimension][value] = count
+            elif '.' in dimension:
+                group, key = dimension.split('.', 1)
+                if group == 'atmosphere' and key in accumulator.atmosphere:
+                    accumulator.atmosphere[key][value] = count
+                elif group in accumulator.details and key in accumulator.details[group]:
+                    accumulator.details[group][key][value] = count
+
+        for favorite_count, row in favorited:
+            if favorite_count > 0:
+                accumulator.total_favorites += favorite_count
+                accumulator.favorited.append((favorite_count, row))
+        return accumulator
+
+    def distribution(self, field):
+        """[{field: value, 'count': n}, ...] ordered by count, like a GROUP BY"""
+        return [
+            {field: value, 'count': count}
+            for value, count in sorted(
+                self.distributions[field].items(), key=lambda item: (-item[1], item[0])
+            )
+        ]
+
+    def most_favorited(self, limit=0):
+        favorited = sorted(self.favorited, key=lambda item: (-item[0], item[1]['id']))
+        if limit and limit > 0:
+            favorited = favorited[:limit]
+        return [
+            {
+                'id': row['id'],
+                'title': row['title'],
+                'country': row['country'],
+                'setting': row['setting'],
+                'favorite_count': favorite_count,
+            }
+            for favorite_count, row in favorited
+        ]
+
+    def summary(self, sections=()):
+        """
+        Headline totals plus only the requested chart ``sections``
+        ('<field>_data', 'age_ranges', 'masculine_age_ranges')
+        """
+        total = self.total_scenes
+        summary = {
+            'total_scenes': total,
+            'total_favorites': self.total_favorites,
+            'avg_effeminate_age': self.effeminate_age_sum / total if total else None,
+            'avg_masculine_age': self.masculine_age_sum / total if total else None,
+        }
+        for section in sections:
+            if section == 'age_ranges':
+                summary[section] = age_histogram(self.effeminate_ages)
+            elif section == 'masculine_age_ranges':
+                summary[section] = age_histogram(self.masculine_ages)
+            else:
+                summary[section] = self.distribution(section[:-len('_data')])
+        return summary
+
+    def result(self, limit_favorites=0):
+        total = self.total_scenes
+        result = {
+            'total_scenes': total,
+            'total_favorites': self.total_favorites,
+            'avg_effeminate_age': self.effeminate_age_sum / total if total else None,
+            'avg_masculine_age': self.masculine_age_sum / total if total else None,
+            'min_effeminate_age': min(self.effeminate_ages) if total else None,
+            'max_effeminate_age': max(self.effeminate_ages) if total else None,
+            'min_masculine_age': min(self.masculine_ages) if total else None,
+            'max_masculine_age': max(self.masculine_ages) if total else None,
+            'age_ranges': age_histogram(self.effeminate_ages),
+            'masculine_age_ranges': age_histogram(self.masculine_ages),
+            'most_favorited': self.most_favorited(limit_favorites),
+            'atmosphere_stats': {
+                field: dict(counter.most_common(TOP_VALUES))
+                for field, counter in self.atmosphere.items()
+            },
+        }
+        for field in DISTRIBUTION_FIELDS:
+            result[f'{field}_data'] = self.distribution(field)
+        for field in DETAIL_FIELDS:
+            result[f'{field}_stats'] = {
+                character: dict(counter.most_common(TOP_VALUES))
+                for character, counter in self.details[field].items()
+            }
+        return result
+
+
+class AnalyticsEngine:
+    """
+    Computes every analytics section from a single stream of scene rows.
+    One query fetches favorite counts per scene, one streams the scenes;
+    filters are applied in Python so the unfiltered dropdown options come
+    out of the same pass.
+
+    With ``details_in_database`` the details JSON is not streamed at all:
+    each details/atmosphere breakdown is a GROUP BY over the extracted key
+    on the filtered queryset, limited to TOP_VALUES rows by the database.
+    """
+
+    chunk_size = 500
+    details_in_database = True
+
+    def compute(self, filters=None, limit_favorites=0):
+        """Return the filtered sections plus 'all_<field>_data' for dropdowns"""
+        from django.apps import apps
+        from django.db.models import Count
+        Scene = apps.get_model('scenes_app', 'Scene')
+        FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+
+        matches = self.build_matcher(filters)
+
+        favorite_counts = dict(
+            FavoriteScene.objects.values_list('scene_id')
+            .annotate(count=Count('id')).order_by()
+        )
+
+        accumulator = AnalyticsAccumulator()
+        all_distributions = {field: Counter() for field in DISTRIBUTION_FIELDS}
+
+        columns = ENGINE_COLUMNS
+        if self.details_in_database:
+            columns = tuple(column for column in ENGINE_COLUMNS if column != 'details')
+
+        rows = Scene.objects.order_by().values(*columns).iterator(chunk_size=self.chunk_size)
+        for row in rows:
+            for field in DISTRIBUTION_FIELDS:
+                all_distributions[field][row[field]] += 1
+            if matches(row):
+                accumulator.add(row, favorite_counts.get(row['id'], 0))
+
+        result = accumulator.result(limit_favorites)
+        if self.details_in_database and accumulator.total_scenes:
+            result.update(self.details_breakdowns(Scene.objects.filter(self.build_filter(filters))))
+        for field in DISTRIBUTION_FIELDS:
+            result[f'all_{field}_data'] = [
+                {field: value, 'count': count}
+                for value, count in sorted(
+                    all_distributions[field].items(), key=lambda item: (-item[1], item[0])
+                )
+            ]
+        return result
+
+    def summaries(self, filter_sets, sections=()):
+        """
+        AnalyticsAccumulator.summary for each filter set, from one favorite
+        count query and one pass over the scene rows shared by every set
+        """
+        from django.apps import apps
+        from django.db.models import Count
+        Scene = apps.get_model('scenes_app', 'Scene')
+        FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+
+        matchers = [self.build_matcher(filters) for filters in filter_sets]
+        accumulators = [AnalyticsAccumulator() for _ in matchers]
+        favorite_counts = dict(
+            FavoriteScene.objects.values_list('scene_id')
+            .annotate(count=Count('id')).order_by()
+        )
+
+        columns = tuple(column for column in ENGINE_COLUMNS if column != 'details')
+        rows = Scene.objects.order_by().values(*columns).iterator(chunk_size=self.chunk_size)
+        for row in rows:
+            for matches, accumulator in zip(matchers, accumulators):
+                if matches(row):
+                    accumulator.add(row, favorite_counts.get(row['id'], 0))
+        return [accumulator.summary(sections) for accumulator in accumulators]
+
+    def details_breakdowns(self, queryset):
+        """
+        '<field>_stats' and 'atmosphere_stats' computed by the database.
+        Each breakdown groups the lower-cased, trimmed JSON value (json_extract
+        on SQLite) over ``queryset`` as a subquery and keeps the TOP_VALUES
+        most common; ties go to the value seen first, as in the row engine.
+        """
+        from django.db.models import Count, Min
+        from django.db.models.fields.json import KeyTextTransform, KeyTransform
+        from django.db.models.functions import Lower, Trim
+
+        def top_values(section, key):
+            rows = (
+                queryset.order_by()
+                .annotate(value=Lower(Trim(KeyTextTransform(key, KeyTransform(section, 'details')))))
+                .exclude(value__isnull=True)
+                .exclude(value='')
+                .values('value')
+                .annotate(count=Count('id'), first_seen=Min('id'))
+                .order_by('-count', 'first_seen')
+                .values_list('value', 'count')[:TOP_VALUES]
+            )
+            return dict(rows)
+
+        result = {
+            f'{field}_stats': {
+                character: top_values(character, field)
+                for character in ('effeminate', 'masculine')
+            }
+            for field in DETAIL_FIELDS
+        }
+        result['atmosphere_stats'] = {field: top_values('atmosphere', field) for field in ATMOSPHERE_FIELDS}
+        return result
+
+    def build_filter(self, filters=None):
+        """Q object equivalent to build_matcher, for querysets"""
+        from django.db.models import Q
+
+        condition = Q()
+        filters = filters or {}
+
+        for field in DISTRIBUTION_FIELDS:
+            value = filters.get(field)
+            if value and value != 'all':
+                condition &= Q(**{field: value})
+
+        age_range = filters.get('ageRange')
+        if age_range and age_range != 'all':
+            bounds = parse_age_range(age_range)
+            if bounds:
+                min_age, max_age = bounds
+                condition &= Q(effeminate_age__gte=min_age)
+                if max_age is not None:
+                    condition &= Q(effeminate_age__lte=max_age)
+
+        return condition
+
+    def build_matcher(self, filters=None):
+        """Row predicate equivalent to the analytics queryset filters"""
+        checks = []
+        filters = filters or {}
+
+        for field in DISTRIBUTION_FIELDS:
+            value = filters.get(field)
+            if value and value != 'all':
+                checks.append(lambda row, field=field, value=value: row[field] == value)
+
+        age_range = filters.get('ageRange')
+        if age_range and age_range != 'all':
+            bounds = parse_age_range(age_range)
+            if bounds:
+                min_age, max_age = bounds
+                checks.append(lambda row: row['effeminate_age'] >= min_age)
+                if max_age is not None:
+                    checks.append(lambda row: row['effeminate_age'] <= max_age)
+
+        return lambda row: all(check(row) for check in checks)
+
+
+# Global instance
+analytics_engine = AnalyticsEngine()
@@ -0,0 +1,301 @@
+from collections import Counter
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the ORM engine is used instead
+    np = None
+
+from .analytics_engine import (
+    ATMOSPHERE_FIELDS, DETAIL_FIELDS, DISTRIBUTION_FIELDS, ENGINE_COLUMNS, TOP_VALUES,
+    age_histogram, normalize_detail, parse_age_range,
+)
+from .cache_versions import cache_versions
+
+
+class ColumnEncoder:
+    """Dictionary-encodes string values to dense integer codes in first-seen order"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ColumnarSnapshot:
+    """
+    One immutable column-per-attribute copy of the scenes table.
+    Facets and details values are dictionary-encoded (-1 marks a missing
+    details value), so any filter combination is a boolean mask and every
+    distribution is a bincount over the masked codes.
+    """
+
+    def __init__(self, rows):
+        facet_encoders = {field: ColumnEncoder() for field in DISTRIBUTION_FIELDS}
+        detail_keys = [(field, character) for field in DETAIL_FIELDS
+                       for character in ('effeminate', 'masculine')]
+        detail_encoders = {key: ColumnEncoder() for key in detail_keys}
+        atmosphere_encoders = {field: ColumnEncoder() for field in ATMOSPHERE_FIELDS}
+
+        ids, titles = [], []
+        effeminate_ages, masculine_ages = [], []
+        facet_codes = {field: [] for field in DISTRIBUTION_FIELDS}
+        detail_codes = {key: [] for key in detail_keys}
+        atmosphere_codes = {field: [] for field in ATMOSPHERE_FIELDS}
+
+        for row in rows:
+            ids.append(row['id'])
+            titles.append(row['title'])
+            effeminate_ages.append(row['effeminate_age'])
+            masculine_ages.append(row['masculine_age'])
+            for field in DISTRIBUTION_FIELDS:
+                facet_codes[field].append(facet_encoders[field].encode(row[field]))
+
+            details = row['details'] if isinstance(row['details'], dict) else {}
+            for field, character in detail_keys:
+                character_details = details.get(character)
+                value = None
+                if isinstance(character_details, dict):
+                    value = normalize_detail(character_details.get(field))
+                detail_codes[(field, character)].append(
+                    detail_encoders[(field, character)].encode(value) if value else -1
+                )
+
+            atmosphere = details.get('atmosphere')
+            for field in ATMOSPHERE_FIELDS:
+                value = None
+                if isinstance(atmosphere, dict):
+                    value = normalize_detail(atmosphere.get(field))
+                atmosphere_codes[field].append(
+                    atmosphere_encoders[field].encode(value) if value else -1
+                )
+
+        self.size = len(ids)
+        self.ids = np.array(ids, dtype=np.int64)
+        self.titles = titles
+        self.effeminate_age = np.array(effeminate_ages, dtype=np.int64)
+        self.masculine_age = np.array(masculine_ages, dtype=np.int64)
+        self.facets = {
+            field: (np.array(facet_codes[field], dtype=np.int32), facet_encoders[field].values)
+            for field in DISTRIBUTION_FIELDS
+        }
+        self.details = {
+            key: (np.array(detail_codes[key], dtype=np.int32), detail_encoders[key].values)
+            for key in detail_keys
+        }
+        self.atmosphere = {
+            field: (np.array(atmosphere_codes[field], dtype=np.int32), atmosphere_encoders[field].values)
+            for field in ATMOSPHERE_FIELDS
+        }
+        self.facet_lookup = {field: encoder.codes for field, encoder in facet_encoders.items()}
+        self.favorite_counts = np.zeros(self.size, dtype=np.int64)
+        self.all_distributions = {
+            field: self._distribution(field, codes, values, None)
+            for field, (codes, values) in self.facets.items()
+        }
+
+    def set_favorite_counts(self, counts_by_id):
+        """Align {scene_id: count} with the id column"""
+        favorite_counts = np.zeros(self.size, dtype=np.int64)
+        if counts_by_id and self.size:
+            scene_ids = np.fromiter(counts_by_id.keys(), dtype=np.int64, count=len(counts_by_id))
+            counts = np.fromiter(counts_by_id.values(), dtype=np.int64, count=len(counts_by_id))
+            positions = np.searchsorted(self.ids, scene_ids)
+            positions = np.minimum(positions, self.size - 1)
+            found = self.ids[positions] == scene_ids
+            favorite_counts[positions[found]] = counts[found]
+        self.favorite_counts = favorite_counts
+
+    def mask(self, filters=None):
+        """Boolean row mask equivalent to AnalyticsEngine.build_matcher"""
+        mask = np.ones(self.size, dtype=bool)
+        filters = filters or {}
+
+        for field in DISTRIBUTION_FIELDS:
+            value = filters.get(field)
+            if value and value != 'all':
+                code = self.facet_lookup[field].get(value)
+                if code is None:
+                    mask[:] = False
+                else:
+                    mask &= self.facets[field][0] == code
+
+        age_range = filters.get('ageRange')
+        if age_range and age_range != 'all':
+            bounds = parse_age_range(age_range)
+            if bounds:
+                min_age, max_age = bounds
+                mask &= self.effeminate_age >= min_age
+                if max_age is not None:
+                    mask &= self.effeminate_age <= max_age
+        return mask
+
+    def compute(self, filters=None, limit_favorites=0):
+        """Same sections as AnalyticsEngine.compute, from vectorised column scans"""
+        mask = self.mask(filters)
+        total = int(mask.sum())
+        effeminate_ages = self.effeminate_age[mask]
+        masculine_ages = self.masculine_age[mask]
+
+        result = {
+            'total_scenes': total,
+            'total_favorites': int(self.favorite_counts[mask].sum()),
+            'avg_effeminate_age': float(effeminate_ages.mean()) if total else None,
+            'avg_masculine_age': float(masculine_ages.mean()) if total else None,
+            'min_effeminate_age': int(effeminate_ages.min()) if total else None,
+            'max_effeminate_age': int(effeminate_ages.max()) if total else None,
+            'min_masculine_age': int(masculine_ages.min()) if total else None,
+            'max_masculine_age': int(masculine_ages.max()) if total else None,
+            'age_ranges': age_histogram(self._age_counts(effeminate_ages)),
+            'masculine_age_ranges': age_histogram(self._age_counts(masculine_ages)),
+            'most_favorited': self._most_favorited(mask, limit_favorites),
+            'atmosphere_stats': {
+                field: self._top_values(codes, values, mask)
+                for field, (codes, values) in self.atmosphere.items()
+            },
+        }
+        for field, (codes, values) in self.facets.items():
+            result[f'{field}_data'] = self._distribution(field, codes, values, mask)
+            result[f'all_{field}_data'] = self.all_distributions[field]
+        for field in DETAIL_FIELDS:
+            result[f'{field}_stats'] = {
+                character: self._top_values(*self.details[(field, character)], mask)
+                for character in ('effeminate', 'masculine')
+            }
+        return result
+
+    def summary(self, filters=None, sections=()):
+        """Same as AnalyticsAccumulator.summary, from the masked columns"""
+        unfiltered = not any(value and value != 'all' for value in (filters or {}).values())
+        mask = self.mask(filters)
+        total = int(mask.sum())
+        summary = {
+            'total_scenes': total,
+            'total_favorites': int(self.favorite_counts[mask].sum()),
+            'avg_effeminate_age': float(self.effeminate_age[mask].mean()) if total else None,
+            'avg_masculine_age': float(self.masculine_age[mask].mean()) if total else None,
+        }
+        for section in sections:
+            if section == 'age_ranges':
+                summary[section] = age_histogram(self._age_counts(self.effeminate_age[mask]))
+            elif section == 'masculine_age_ranges':
+                summary[section] = age_histogram(self._age_counts(self.masculine_age[mask]))
+            else:
+                field = section[:-len('_data')]
+                if unfiltered:
+                    # The dropdown distributions already cover every scene
+                    summary[section] = self.all_distributions[field]
+                else:
+                    summary[section] = self._distribution(field, *self.facets[field], mask)
+        return summary
+
+    def _age_counts(self, ages):
+        if not ages.size:
+            return Counter()
+        offset = int(ages.min())
+        counts = np.bincount(ages - offset)
+        present = np.flatnonzero(counts)
+        return Counter(dict(zip((present + offset).tolist(), counts[present].tolist())))
+
+    def _distribution(self, field, codes, values, mask):
+        if mask is not None:
+            codes = codes[mask]
+        counts = np.bincount(codes, minlength=len(values))
+        return [
+            {field: values[code], 'count': int(counts[code])}
+            for code in sorted(np.flatnonzero(counts).tolist(),
+                               key=lambda code: (-counts[code], values[code]))
+        ]
+
+    def _top_values(self, codes, values, mask):
+        codes = codes[mask]
+        codes = codes[codes >= 0]
+        present, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+        # Ties keep first-seen order within the filtered rows, like Counter.most_common
+        order = np.lexsort((first_seen, -counts))[:TOP_VALUES]
+        return {values[present[i]]: int(counts[i]) for i in order.tolist()}
+
+    def _most_favorited(self, mask, limit=0):
+        positions = np.flatnonzero(mask & (self.favorite_counts > 0))
+        positions = positions[np.lexsort((self.ids[positions], -self.favorite_counts[positions]))]
+        if limit and limit > 0:
+            positions = positions[:limit]
+        country_codes, countries = self.facets['country']
+        setting_codes, settings = self.facets['setting']
+        return [
+            {
+                'id': int(self.ids[p]),
+                'title': self.titles[p],
+                'country': countries[country_codes[p]],
+                'setting': settings[setting_codes[p]],
+                'favorite_count': int(self.favorite_counts[p]),
+            }
+            for p in positions.tolist()
+        ]
+
+
+class AnalyticsSnapshot:
+    """
+    Per-worker ColumnarSnapshot, rebuilt when the 'scenes' cache version moves
+    and re-aligned with favorite counts when the 'favorites' version moves.
+    """
+
+    chunk_size = 500
+
+    def __init__(self):
+        self._snapshot = None
+        self._version = None
+        self._favorites_version = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return np is not None
+
+    def snapshot(self):
+        """Current ColumnarSnapshot, rebuilding stale columns first"""
+        version, favorites_version = cache_versions.get_many('scenes', 'favorites')
+        if version != self._version or favorites_version != self._favorites_version:
+            with self._lock:
+                if version != self._version:
+                    self._snapshot = self._load_snapshot()
+                    self._version = version
+                    self._favorites_version = None
+                if favorites_version != self._favorites_version:
+                    self._snapshot.set_favorite_counts(self._load_favorite_counts())
+                    self._favorites_version = favorites_version
+        return self._snapshot
+
+    def compute(self, filters=None, limit_favorites=0):
+        """Filtered analytics sections from the snapshot"""
+        return self.snapshot().compute(filters, limit_favorites)
+
+    def summaries(self, filter_sets, sections=()):
+        """ColumnarSnapshot.summary for each filter set, over one snapshot"""
+        snapshot = self.snapshot()
+        return [snapshot.summary(filters, sections) for filters in filter_sets]
+
+    def _load_snapshot(self):
+        from django.apps import apps
+        Scene = apps.get_model('scenes_app', 'Scene')
+        rows = Scene.objects.order_by('id').values(*ENGINE_COLUMNS).iterator(chunk_size=self.chunk_size)
+        return ColumnarSnapshot(rows)
+
+    def _load_favorite_counts(self):
+        from django.apps import apps
+        from django.db.models import Count
+        FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+        return dict(
+            FavoriteScene.objects.values_list('scene_id')
+            .annotate(count=Count('id')).order_by()
+        )
+
+
+# Global instance
+analytics_snapshot = AnalyticsSnapshot()
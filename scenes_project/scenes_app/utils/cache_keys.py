@@ -0,0 +1,72 @@
+import hashlib
+import json
+
+from .analytics_engine import DISTRIBUTION_FIELDS, parse_age_range
+
+
+# Filters analytics understands, in canonical order
+ANALYTICS_FILTERS = DISTRIBUTION_FIELDS + ('ageRange',)
+
+
+def normalize_filters(filters):
+    """
+    Canonical form of an analytics filter dict: unknown keys, blanks and
+    'all' are dropped, values are stripped and age ranges rewritten as
+    'min-max' / 'min+'. Equal filter sets always normalise to equal dicts.
+    """
+    normalized = {}
+    for name in ANALYTICS_FILTERS:
+        value = (filters or {}).get(name)
+        if value is None:
+            continue
+        value = str(value).strip()
+        if not value or value == 'all':
+            continue
+        if name == 'ageRange':
+            try:
+                bounds = parse_age_range(value)
+            except ValueError:
+                bounds = None
+            if not bounds:
+                continue
+            min_age, max_age = bounds
+            value = f"{min_age}+" if max_age is None else f"{min_age}-{max_age}"
+        normalized[name] = value
+    return normalized
+
+
+def signature(params):
+    """Stable digest of a JSON-compatible parameter dict, identical in every process"""
+    canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), ensure_ascii=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+class CacheKeyRegistry:
+    """
+    Named cache key schemes.
+    Each scheme binds a CacheNamespace and a schema version; views, utils and
+    management commands build keys through the registry so the same
+    parameters map to the same Redis entry in every worker.
+    """
+
+    def __init__(self):
+        self._schemes = {}
+
+    def register(self, name, namespace, version=1):
+        self._schemes[name] = (namespace, version)
+
+    def schemes(self):
+        """{name: (namespace, version)} of every registered scheme"""
+        return dict(self._schemes)
+
+    def key(self, name, **params):
+        namespace, version = self._schemes[name]
+        return namespace.key(name, f"v{version}", signature(params))
+
+    def previous_key(self, name, **params):
+        namespace, version = self._schemes[name]
+        return namespace.previous_key(name, f"v{version}", signature(params))
+
+
+# Global instance
+cache_keys = CacheKeyRegistry()
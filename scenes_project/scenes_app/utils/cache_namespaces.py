@@ -0,0 +1,62 @@
+from django.conf import settings
+
+from .cache_keys import cache_keys
+from .cache_versions import cache_versions
+from .tiered_cache import tiered_cache
+
+
+class CacheNamespace:
+    """
+    Group of cache entries sharing one generation counter.
+    Every key embeds the current generation, so invalidating the whole
+    namespace is a single INCR; entries of older generations are never read
+    again and simply expire through their TTL.
+    Namespaces register with tiered_cache, which counts their traffic; with
+    ``local`` their entries are also kept in each worker's L1.
+    """
+
+    def __init__(self, name, timeout=None, local=False):
+        self.name = name
+        self.timeout = timeout
+        self.local = local
+        tiered_cache.register(self)
+
+    @property
+    def generation(self):
+        return cache_versions.get(self.name)
+
+    def key(self, *parts):
+        """Cache key for ``parts`` under the current generation"""
+        suffix = ':'.join(str(part) for part in parts)
+        return f"{self.name}:g{self.generation}:{suffix}"
+
+    def previous_key(self, *parts):
+        """Generation-independent key holding the last value stored for ``parts``"""
+        suffix = ':'.join(str(part) for part in parts)
+        return f"{self.name}:previous:{suffix}"
+
+    def invalidate(self):
+        """Orphan every entry in the namespace; returns the new generation"""
+        return cache_versions.bump(self.name)
+
+
+_analytics_timeouts = getattr(settings, 'ANALYTICS_CACHE_TIMEOUTS', {})
+
+# Shared namespaces
+analytics_full_cache = CacheNamespace(
+    'analytics_full_analytics', _analytics_timeouts.get('full_analytics', 1800), local=True
+)
+analytics_filtered_cache = CacheNamespace(
+    'analytics_filtered_analytics', _analytics_timeouts.get('filtered_analytics', 900), local=True
+)
+analytics_comparison_cache = CacheNamespace(
+    'analytics_comparison', _analytics_timeouts.get('comparison', 900), local=True
+)
+search_cache = CacheNamespace('search', getattr(settings, 'SEARCH_CACHE_TIMEOUT', 300))
+listing_cache = CacheNamespace('listing', getattr(settings, 'LISTING_CACHE_TIMEOUT', 600), local=True)
+
+# Key schemes built from normalised parameters (see cache_keys)
+cache_keys.register('analytics.full_analytics', analytics_full_cache)
+cache_keys.register('analytics.filtered_analytics', analytics_filtered_cache)
+cache_keys.register('analytics.comparison', analytics_comparison_cache)
+cache_keys.register('search.results', search_cache)
@@ -0,0 +1,126 @@
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Counters tracked per namespace
+CACHE_METRICS = (
+    'memory_hits', 'redis_hits', 'misses',
+    'stale_served', 'previous_served', 'waited',
+    'regenerations', 'regeneration_ms',
+    'stores', 'payload_bytes',
+)
+
+
+class CacheStats:
+    """
+    Hit, miss, regeneration and payload counters per cache namespace.
+    Events are counted in worker memory and added to shared counters in the
+    cache (one INCR per changed counter) at most every ``flush_interval``
+    seconds, so instrumentation adds no round trips to a cache hit and the
+    report covers every worker.
+    """
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval if flush_interval is not None else getattr(
+            settings, 'CACHE_STATS_FLUSH_INTERVAL', 10
+        )
+        self._pending = Counter()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, namespace, metric, amount=1):
+        if not namespace:
+            return
+        with self._lock:
+            self._pending[(namespace, metric)] += amount
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add this worker's pending counts to the shared counters"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+
+        for (namespace, metric), amount in pending.items():
+            key = self._counter_key(namespace, metric)
+            try:
+                cache.add(key, 0, None)
+                cache.incr(key, int(amount))
+            except Exception as e:
+                logger.warning(f"Could not flush cache stats for {key}: {str(e)}")
+
+    def report(self, namespaces, count_keys=False):
+        """
+        {namespace: counters plus hit_rate, average regeneration time and
+        payload size, generation, timeout and local key count} for
+        ``namespaces``. ``count_keys`` also counts each namespace's keys in
+        the shared cache with a keyspace SCAN, so it is meant for the
+        management command only.
+        """
+        from .tiered_cache import tiered_cache
+
+        self.flush()
+        keys = [self._counter_key(namespace.name, metric) for namespace in namespaces for metric in CACHE_METRICS]
+        found = cache.get_many(keys)
+
+        report = {}
+        for namespace in namespaces:
+            counters = {
+                metric: found.get(self._counter_key(namespace.name, metric)) or 0
+                for metric in CACHE_METRICS
+            }
+            lookups = counters['memory_hits'] + counters['redis_hits'] + counters['misses']
+            hits = counters['memory_hits'] + counters['redis_hits']
+            report[namespace.name] = dict(
+                counters,
+                lookups=lookups,
+                hit_rate=round(hits / lookups, 3) if lookups else None,
+                avg_regeneration_ms=(
+                    round(counters['regeneration_ms'] / counters['regenerations'], 1)
+                    if counters['regenerations'] else None
+                ),
+                avg_payload_bytes=(
+                    round(counters['payload_bytes'] / counters['stores'])
+                    if counters['stores'] and counters['payload_bytes'] else None
+                ),
+                generation=namespace.generation,
+                timeout=namespace.timeout,
+                local=namespace.local,
+                redis_keys=(
+                    self._count_keys(f"{namespace.name}:g{namespace.generation}:*")
+                    if count_keys else None
+                ),
+                local_keys=tiered_cache.local.count_prefix(f"{namespace.name}:g"),
+            )
+        return report
+
+    def reset(self, namespaces):
+        """Zero the shared counters of ``namespaces`` and this worker's pending counts"""
+        with self._lock:
+            self._pending.clear()
+        cache.delete_many([
+            self._counter_key(namespace.name, metric)
+            for namespace in namespaces for metric in CACHE_METRICS
+        ])
+
+    def _count_keys(self, pattern):
+        # django-redis scans with SCAN; other backends cannot enumerate keys
+        iter_keys = getattr(cache, 'iter_keys', None)
+        if iter_keys is None:
+            return None
+        return sum(1 for _ in iter_keys(pattern))
+
+    def _counter_key(self, namespace, metric):
+        return f"cache_stats:{namespace}:{metric}"
+
+
+# Global instance
+cache_stats = CacheStats()
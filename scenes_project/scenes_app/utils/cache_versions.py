@@ -0,0 +1,48 @@
+from django.core.cache import cache
+import time
+
+
+class CacheVersions:
+    """
+    Monotonic version counters kept in the cache.
+    Signals bump a counter whenever the data it covers changes, so anything
+    derived from that data (ETags, cache keys) can embed the current value.
+    """
+
+    def get(self, name):
+        """Current version of ``name``, initialising the counter if needed"""
+        version = cache.get(self._cache_key(name))
+        if version is None:
+            version = self._initial_version()
+            if not cache.add(self._cache_key(name), version, None):
+                version = cache.get(self._cache_key(name), version)
+        return version
+
+    def get_many(self, *names):
+        """Current versions of several counters as a tuple, in order"""
+        found = cache.get_many([self._cache_key(name) for name in names])
+        return tuple(
+            found.get(self._cache_key(name)) or self.get(name)
+            for name in names
+        )
+
+    def bump(self, name):
+        """Advance the version of ``name`` and return the new value"""
+        try:
+            return cache.incr(self._cache_key(name))
+        except ValueError:
+            # Counter missing or evicted - restart above any value handed out before
+            version = self._initial_version()
+            cache.set(self._cache_key(name), version, None)
+            return version
+
+    def _initial_version(self):
+        # Millisecond clock keeps a re-created counter ahead of older values
+        return int(time.time() * 1000)
+
+    def _cache_key(self, name):
+        return f"version_{name}"
+
+
+# Global instance
+cache_versions = CacheVersions()
@@ -0,0 +1,127 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.db import close_old_connections
+from itertools import product
+import logging
+import time
+
+from .analytics_engine import DISTRIBUTION_FIELDS, parse_age_range
+from .cache_keys import ANALYTICS_FILTERS
+from .cached_analytics import cached_analytics
+
+logger = logging.getLogger(__name__)
+
+
+# ageRange options offered by the analytics filter panel (analytics-filters.js)
+AGE_RANGE_FILTERS = ('18-25', '26-35', '36-45', '46-55', '55+')
+
+
+class CacheWarmer:
+    """
+    Pre-computes the filtered analytics entries the analytics page asks for.
+    Every combination of country, setting, emotion and ageRange that matches
+    at least one scene is enumerated from one GROUP BY over the scenes,
+    largest first, and computed through analyze_scenes_cached with the API's
+    parameters on a bounded thread pool, so each warmed entry is the one a
+    request will read.
+    """
+
+    @property
+    def concurrency(self):
+        return getattr(settings, 'ANALYTICS_WARM_CONCURRENCY', 4)
+
+    def combinations(self, limit=None):
+        """
+        Filter dicts of every non-empty combination, ordered by the number of
+        scenes they match (ties in filter order); ``limit`` keeps the first N.
+        """
+        from django.apps import apps
+        from django.db.models import Count
+        Scene = apps.get_model('scenes_app', 'Scene')
+
+        groups = (
+            Scene.objects.order_by().values(*DISTRIBUTION_FIELDS, 'effeminate_age')
+            .annotate(scene_count=Count('id'))
+        )
+        scene_counts = Counter()
+        for group in groups:
+            values = [(field, group[field]) for field in DISTRIBUTION_FIELDS if group[field]]
+            values += [('ageRange', age_range) for age_range in self._age_ranges(group['effeminate_age'])]
+            for filters in self._subsets(values):
+                scene_counts[filters] += group['scene_count']
+
+        ordered = sorted(scene_counts.items(), key=lambda item: (-item[1], item[0]))
+        if limit:
+            ordered = ordered[:limit]
+        return [dict(filters) for filters, _ in ordered]
+
+    def warm(self, filter_sets, concurrency=None, progress=None):
+        """
+        Compute ``filter_sets`` with at most ``concurrency`` at a time.
+        ``progress(done, total)`` is called as entries finish. Returns counts
+        of computed, already cached and failed entries plus the elapsed time
+        and throughput in entries per second.
+        """
+        concurrency = max(1, concurrency or self.concurrency)
+        results = Counter()
+        total = len(filter_sets)
+        start_time = time.time()
+
+        with ThreadPoolExecutor(concurrency, thread_name_prefix='cache-warm') as executor:
+            futures = [executor.submit(self._warm_one, filters) for filters in filter_sets]
+            for done, future in enumerate(as_completed(futures), 1):
+                results[future.result()] += 1
+                if progress:
+                    progress(done, total)
+
+        elapsed = time.time() - start_time
+        return {
+            'total': total,
+            'computed': results['computed'],
+            'cached': results['cached'],
+            'failed': results['failed'],
+            'elapsed': elapsed,
+            'per_second': total / elapsed if elapsed else None,
+            'concurrency': concurrency,
+        }
+
+    def _warm_one(self, filters):
+        try:
+            analytics_data = cached_analytics.analyze_scenes_cached(
+                limit_charts=0,
+                filters=filters or None
+            )
+        except Exception as e:
+            logger.error(f"Warming analytics for {filters} failed: {str(e)}")
+            return 'failed'
+        finally:
+            close_old_connections()
+
+        if analytics_data.get('error'):
+            logger.error(f"Warming analytics for {filters} failed: {analytics_data['error']}")
+            return 'failed'
+        return 'cached' if analytics_data['cache_info']['cached'] else 'computed'
+
+    def _age_ranges(self, age):
+        ranges = []
+        for age_range in AGE_RANGE_FILTERS:
+            min_age, max_age = parse_age_range(age_range)
+            if age >= min_age and (max_age is None or age <= max_age):
+                ranges.append(age_range)
+        return ranges
+
+    def _subsets(self, values):
+        """Every combination of ``values`` taking at most one value per filter, as tuples"""
+        options = {}
+        for name, value in values:
+            options.setdefault(name, [None]).append(value)
+        names = [name for name in ANALYTICS_FILTERS if name in options]
+        return [
+            tuple((name, value) for name, value in zip(names, choice) if value is not None)
+            for choice in product(*(options[name] for name in names))
+        ]
+
+
+# Global instance
+cache_warmer = CacheWarmer()
@@ -1,12 +1,30 @@
 from django.core.cache import cache
 from django.conf import settings
-from django.db.models import Count, Avg, Min, Max, Q
-from django.db import connection
-from collections import Counter
-import hashlib
-import json
+import logging
 import time
 
+from .activity_rollups import activity_rollups
+from .analytics_aggregates import analytics_aggregates
+from .analytics_engine import analytics_engine
+from .analytics_snapshot import analytics_snapshot
+from .cache_keys import cache_keys, normalize_filters
+from .cache_namespaces import analytics_comparison_cache, analytics_filtered_cache, analytics_full_cache
+from .data_sync import scene_file_sync
+from .single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+# Chart sections of the payload, and the distribution field behind each facet chart
+CHART_SECTIONS = ('countries', 'settings', 'emotions', 'age_ranges', 'masculine_age_ranges')
+CHART_FIELDS = {'countries': 'country', 'settings': 'setting', 'emotions': 'emotion'}
+
+# Most filter sets accepted by one comparison request
+MAX_COMPARISON_SETS = 10
+
+# Scenes listed in most_favorited unless a caller asks for another limit (0 lists all)
+MOST_FAVORITED_LIMIT = getattr(settings, 'ANALYTICS_MOST_FAVORITED_LIMIT', 10)
+
+
 class CachedAnalytics:
     """
     Redis-cached analytics that preserves ALL features from your original analytics.py
@@ -16,175 +34,234 @@ class CachedAnalytics:
         self.cache_timeouts = getattr(settings, 'ANALYTICS_CACHE_TIMEOUTS', {
             'full_analytics': 1800,
             'filtered_analytics': 900,
+            'comparison': 900,
             'field_distributions': 600,
             'age_ranges': 1200,
             'details_analysis': 1800,
             'sync_check': 300,
         })
-        self.debug = True
+        # Past the soft timeout a cached payload is served while it refreshes in the background
+        self.soft_timeouts = getattr(settings, 'ANALYTICS_CACHE_SOFT_TIMEOUTS', {
+            'full_analytics': 60,
+            'filtered_analytics': 300,
+        })
+        # One generation counter per cache type; invalidation is a single INCR each
+        self.namespaces = {
+            'full_analytics': analytics_full_cache,
+            'filtered_analytics': analytics_filtered_cache,
+            'comparison': analytics_comparison_cache,
+        }
     
-    def analyze_scenes_cached(self, limit_charts=0, limit_favorites=0, filters=None):
+    def analyze_scenes_cached(self, limit_charts=0, limit_favorites=None, filters=None):
         """
         Main analytics function with Redis caching
         Preserves ALL functionality from your original analyze_scenes()
+        Unfiltered analytics are read from the maintained aggregates, filtered
+        combinations are rolled up once; both are cached per generation and
+        hot payloads are served from worker memory (see tiered_cache).
+        Cached payloads are shared, so cache_info is added to a copy, along
+        with sync_info, which is read per response rather than cached.
+        most_favorited holds MOST_FAVORITED_LIMIT scenes unless
+        ``limit_favorites`` is given; 0 lists every favorited scene.
         """
+        if limit_favorites is None:
+            limit_favorites = MOST_FAVORITED_LIMIT
+        # Equivalent filter sets share one cache entry in every worker
+        filters = normalize_filters(filters)
+        if not filters:
+            return self._live_analytics(limit_charts, limit_favorites)
+        
         # Generate cache key based on parameters
-        cache_key = self._generate_cache_key('full_analytics', {
+        params = {
             'limit_charts': limit_charts,
             'limit_favorites': limit_favorites,
-            'filters': filters or {}
-        })
+            'filters': filters
+        }
+        cache_key = self._generate_cache_key('filtered_analytics', params)
+        
+        # Try to get from cache first; on a miss only one worker regenerates
+        logger.debug(f"Checking cache for key: {cache_key}")
+        
+        start_time = time.time()
+        analytics_data, source = single_flight.fetch(
+            cache_key,
+            lambda: self._generate_fresh_analytics(limit_charts, limit_favorites, filters),
+            self.cache_timeouts['filtered_analytics'],
+            previous_key=self._generate_previous_key('filtered_analytics', params),
+            cacheable=lambda data: not data.get('error'),
+            soft_timeout=self.soft_timeouts.get('filtered_analytics'),
+        )
+        elapsed = time.time() - start_time
         
-        # Try to get from cache first
-        if self.debug:
-            print(f"Checking cache for key: {cache_key}")
+        if analytics_data.get('error'):
+            return analytics_data
         
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            if self.debug:
-                print("✅ Analytics data found in cache!")
-            cached_data['cache_info'] = {
-                'cached': True,
+        return dict(
+            analytics_data,
+            cache_info=self._cache_info(cache_key, source, elapsed, 'database'),
+            sync_info=self._get_cached_sync_check(),
+        )
+    
+    def _cache_info(self, cache_key, source, elapsed, computed_source):
+        """cache_info for a single_flight result; ``computed_source`` names the backend on a miss"""
+        if source == 'computed':
+            logger.debug(f"Fresh analytics generated and cached in {elapsed:.2f}s")
+            return {
+                'cached': False,
                 'cache_key': cache_key,
-                'source': 'redis'
+                'source': computed_source,
+                'generation_time': elapsed
             }
-            return cached_data
         
-        if self.debug:
-            print("❌ Cache miss - generating fresh analytics data...")
-            start_time = time.time()
+        logger.debug(f"Analytics data served from cache ({source})")
+        if source == 'memory':
+            source_label = 'memory'
+        elif source == 'cache':
+            source_label = 'redis'
+        else:
+            source_label = f'redis ({source})'
+        return {
+            'cached': True,
+            'cache_key': cache_key,
+            'source': source_label
+        }
+    
+    def compare(self, filter_sets, charts=()):
+        """
+        Stats (plus the requested ``charts``) for several filter sets at once,
+        from the same backend as filtered analytics. Only those sections are
+        computed, in one pass over the snapshot or the scene rows shared by
+        every set; dropdown options and per-scene sections are left out since
+        comparisons never show them. The batch is cached as one entry.
+        """
+        filter_sets = [normalize_filters(filters) for filters in filter_sets]
+        charts = [chart for chart in CHART_SECTIONS if chart in charts]
+        params = {'filter_sets': filter_sets, 'charts': charts}
+        cache_key = self._generate_cache_key('comparison', params)
         
-        # Generate fresh analytics data
-        analytics_data = self._generate_fresh_analytics(limit_charts, limit_favorites, filters)
+        def compute():
+            try:
+                sections_list = self._analytics_backend().summaries(
+                    filter_sets, [self._chart_section(chart) for chart in charts]
+                )
+            except Exception as e:
+                return {'error': f'Cached analytics error: {str(e)}'}
+            comparisons = []
+            for filters, sections in zip(filter_sets, sections_list):
+                comparisons.append({
+                    'filters': filters,
+                    'stats': self._format_stats(sections),
+                    'charts': self._format_charts(sections, charts),
+                })
+            return {'comparisons': comparisons}
+        
+        start_time = time.time()
+        comparison_data, source = single_flight.fetch(
+            cache_key,
+            compute,
+            self.cache_timeouts.get('comparison', 900),
+            cacheable=lambda data: not data.get('error'),
+        )
+        if comparison_data.get('error'):
+            return comparison_data
         
+        cache_info = self._cache_info(cache_key, source, time.time() - start_time, 'database')
+        return dict(comparison_data, cache_info=cache_info)
+    
+    def _live_analytics(self, limit_charts=0, limit_favorites=0):
+        """
+        Unfiltered analytics from the delta-maintained aggregates, cached per
+        generation; computed like filtered analytics until they are seeded
+        """
+        params = {
+            'limit_charts': limit_charts,
+            'limit_favorites': limit_favorites,
+        }
+        cache_key = self._generate_cache_key('full_analytics', params)
+        computed_source = 'aggregates'
+        
+        def compute():
+            nonlocal computed_source
+            try:
+                sections = analytics_aggregates.compute(limit_favorites)
+                if sections is None:
+                    logger.warning("Analytics aggregates are not seeded; run manage_analytics_cache --rebuild-aggregates")
+                    computed_source = 'database'
+                    sections = self._analytics_backend().compute(None, limit_favorites)
+                return self._format_analytics(sections)
+            except Exception as e:
+                return {'error': f'Cached analytics error: {str(e)}'}
+        
+        start_time = time.time()
+        analytics_data, source = single_flight.fetch(
+            cache_key,
+            compute,
+            self.cache_timeouts.get('full_analytics', 1800),
+            cacheable=lambda data: not data.get('error'),
+            soft_timeout=self.soft_timeouts.get('full_analytics'),
+        )
         if analytics_data.get('error'):
             return analytics_data
         
-        # Cache the result
-        cache.set(cache_key, analytics_data, self.cache_timeouts['full_analytics'])
-        
-        if self.debug:
-            elapsed = time.time() - start_time
-            print(f"✅ Fresh analytics generated and cached in {elapsed:.2f}s")
-        
-        analytics_data['cache_info'] = {
-            'cached': False,
-            'cache_key': cache_key,
-            'source': 'database',
-            'generation_time': elapsed if self.debug else None
-        }
-        
-        return analytics_data
+        cache_info = self._cache_info(cache_key, source, time.time() - start_time, computed_source)
+        return dict(analytics_data, cache_info=cache_info, sync_info=self._get_cached_sync_check())
     
     def _generate_fresh_analytics(self, limit_charts=0, limit_favorites=0, filters=None):
         """
-        Generate fresh analytics data using optimized queries
+        Generate fresh analytics data with a single-pass engine
         This preserves ALL your original analytics.py functionality
         """
         try:
-            from django.apps import apps
-            Scene = apps.get_model('scenes_app', 'Scene')
-            FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
-            
-            # Apply filters if provided
-            queryset = Scene.objects.all()
-            if filters:
-                if filters.get('country') and filters['country'] != 'all':
-                    queryset = queryset.filter(country=filters['country'])
-                if filters.get('setting') and filters['setting'] != 'all':
-                    queryset = queryset.filter(setting=filters['setting'])
-                if filters.get('emotion') and filters['emotion'] != 'all':
-                    queryset = queryset.filter(emotion=filters['emotion'])
-                if filters.get('ageRange') and filters['ageRange'] != 'all':
-                    age_range = filters['ageRange']
-                    if '+' in age_range:
-                        min_age = int(age_range.replace('+', ''))
-                        queryset = queryset.filter(effeminate_age__gte=min_age)
-                    elif '-' in age_range:
-                        min_age, max_age = map(int, age_range.split('-'))
-                        queryset = queryset.filter(effeminate_age__gte=min_age, effeminate_age__lte=max_age)
-            
-            # Basic statistics using single query
-            basic_stats = queryset.aggregate(
-                total_scenes=Count('id'),
-                avg_effeminate_age=Avg('effeminate_age'),
-                avg_masculine_age=Avg('masculine_age'),
-                min_effeminate_age=Min('effeminate_age'),
-                max_effeminate_age=Max('effeminate_age'),
-                min_masculine_age=Min('masculine_age'),
-                max_masculine_age=Max('masculine_age')
-            )
-            
-            total_scenes = basic_stats['total_scenes']
+            sections = self._analytics_backend().compute(filters, limit_favorites)
+            return self._format_analytics(sections)
+        except Exception as e:
+            return {'error': f'Cached analytics error: {str(e)}'}
+    
+    def _analytics_backend(self):
+        """Vectorised columns when NumPy is installed, else one pass over the scene rows"""
+        if analytics_snapshot.available:
+            return analytics_snapshot
+        return analytics_engine
+    
+    def _format_analytics(self, sections):
+        """Shape engine or aggregate sections into the analytics payload"""
+        try:
+            total_scenes = sections['total_scenes']
             
             if total_scenes == 0:
                 return self._empty_analytics_response()
             
-            # Get total favorites count
-            if filters:
-                scene_ids = list(queryset.values_list('id', flat=True))
-                total_favorites = FavoriteScene.objects.filter(scene_id__in=scene_ids).count()
-            else:
-                total_favorites = FavoriteScene.objects.count()
-            
-            # Field distributions with caching (for charts - uses filtered queryset)
-            country_data = self._get_cached_field_distribution('country', queryset)
-            setting_data = self._get_cached_field_distribution('setting', queryset)
-            emotion_data = self._get_cached_field_distribution('emotion', queryset)
+            total_favorites = sections['total_favorites']
             
-            # Get ALL available options for filter dropdowns (always unfiltered)
-            all_country_data = self._get_cached_field_distribution('country', None)
-            all_setting_data = self._get_cached_field_distribution('setting', None)
-            all_emotion_data = self._get_cached_field_distribution('emotion', None)
+            # Field distributions (for charts - filtered)
+            country_data = sections['country_data']
+            setting_data = sections['setting_data']
+            emotion_data = sections['emotion_data']
             
-            # Age ranges with caching
-            age_ranges = self._get_cached_age_ranges(queryset)
+            # ALL available options for filter dropdowns (always unfiltered)
+            all_country_data = sections['all_country_data']
+            all_setting_data = sections['all_setting_data']
+            all_emotion_data = sections['all_emotion_data']
             
-            # Most favorited scenes
-            most_favorited = self._get_most_favorited_scenes(queryset, limit_favorites)
-            
-            # Details analysis with caching
-            appearance_stats = self._get_cached_details_analysis('appearance', queryset)
-            hair_stats = self._get_cached_details_analysis('hair', queryset)
-            clothing_stats = self._get_cached_details_analysis('clothing', queryset)
-            atmosphere_stats = self._get_cached_atmosphere_analysis(queryset)
+            age_ranges = sections['age_ranges']
+            masculine_age_ranges = sections['masculine_age_ranges']
+            most_favorited = sections['most_favorited']
             
-            # Recent activity calculation (preserved from original)
-            recent_scenes = self._calculate_recent_activity(total_scenes)
+            appearance_stats = sections['appearance_stats']
+            hair_stats = sections['hair_stats']
+            clothing_stats = sections['clothing_stats']
+            atmosphere_stats = sections['atmosphere_stats']
             
-            # Data sync check with caching
-            sync_info = self._get_cached_sync_check()
+            # Favorite and search trends from the activity rollups
+            recent_activity = self._calculate_recent_activity()
             
             # Format data for JavaScript consumption
             return {
                 # Stats object expected by JavaScript
-                'stats': {
-                    'total_scenes': total_scenes,
-                    'total_favorites': total_favorites,
-                    'avg_effeminate_age': round(basic_stats['avg_effeminate_age'] or 0, 1),
-                    'avg_masculine_age': round(basic_stats['avg_masculine_age'] or 0, 1),
-                    'favorite_rate': round((total_favorites / total_scenes) * 100, 1) if total_scenes > 0 else 0,
-                },
+                'stats': self._format_stats(sections),
                 
                 # Charts object expected by JavaScript
-                'charts': {
-                    'countries': {
-                        'labels': [item['country'] for item in country_data],
-                        'data': [item['count'] for item in country_data]
-                    },
-                    'settings': {
-                        'labels': [item['setting'] for item in setting_data],
-                        'data': [item['count'] for item in setting_data]
-                    },
-                    'emotions': {
-                        'labels': [item['emotion'] for item in emotion_data],
-                        'data': [item['count'] for item in emotion_data]
-                    },
-                    'age_ranges': {
-                        'labels': list(age_ranges.keys()),
-                        'data': list(age_ranges.values())
-                    }
-                },
+                'charts': self._format_charts(sections),
                 
                 # Filters object expected by JavaScript for dropdown population (ALWAYS ALL OPTIONS)
                 'filters': {
@@ -199,309 +276,89 @@ class CachedAnalytics:
                 # Legacy fields for template compatibility
                 'total_scenes': total_scenes,
                 'total_favorites': total_favorites,
-                'avg_effeminate_age': round(basic_stats['avg_effeminate_age'] or 0, 1),
-                'avg_masculine_age': round(basic_stats['avg_masculine_age'] or 0, 1),
-                'min_effeminate_age': basic_stats['min_effeminate_age'] or 0,
-                'max_effeminate_age': basic_stats['max_effeminate_age'] or 0,
-                'min_masculine_age': basic_stats['min_masculine_age'] or 0,
-                'max_masculine_age': basic_stats['max_masculine_age'] or 0,
+                'avg_effeminate_age': round(sections['avg_effeminate_age'] or 0, 1),
+                'avg_masculine_age': round(sections['avg_masculine_age'] or 0, 1),
+                'min_effeminate_age': sections['min_effeminate_age'] or 0,
+                'max_effeminate_age': sections['max_effeminate_age'] or 0,
+                'min_masculine_age': sections['min_masculine_age'] or 0,
+                'max_masculine_age': sections['max_masculine_age'] or 0,
                 'country_data': country_data,
                 'setting_data': setting_data,
                 'emotion_data': emotion_data,
                 'age_ranges': age_ranges,
+                'masculine_age_ranges': masculine_age_ranges,
                 'appearance_stats': appearance_stats,
                 'hair_stats': hair_stats,
                 'clothing_stats': clothing_stats,
                 'atmosphere_stats': atmosphere_stats,
-                'recent_scenes': recent_scenes,
+                'recent_activity': recent_activity,
                 'favorite_rate': round((total_favorites / total_scenes) * 100, 1) if total_scenes > 0 else 0,
                 'data_summary': {
                     'unique_countries': len(country_data),
                     'unique_settings': len(setting_data),
                     'unique_emotions': len(emotion_data),
-                    'age_range_span': (basic_stats['max_effeminate_age'] or 0) - (basic_stats['min_effeminate_age'] or 0)
+                    'age_range_span': (sections['max_effeminate_age'] or 0) - (sections['min_effeminate_age'] or 0)
                 },
-                'sync_info': sync_info
             }
             
         except Exception as e:
             return {'error': f'Cached analytics error: {str(e)}'}
     
-    def _get_cached_field_distribution(self, field_name, queryset=None):
-        """Get field distribution with caching - respects filtered queryset"""
-        # Generate cache key that includes queryset info for proper filtering
-        if queryset is None:
-            from django.apps import apps
-            Scene = apps.get_model('scenes_app', 'Scene')
-            queryset = Scene.objects.all()
-            cache_key = self._generate_cache_key('field_dist', {'field': field_name})
-        else:
-            # Include queryset hash in cache key to ensure filtered data is cached separately
-            queryset_sql = str(queryset.query)
-            cache_key = self._generate_cache_key('field_dist', {
-                'field': field_name, 
-                'query_hash': hash(queryset_sql)
-            })
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        # Generate fresh data using the provided queryset
-        data = list(queryset.values(field_name)
-                   .annotate(count=Count(field_name))
-                   .order_by('-count'))
-        
-        cache.set(cache_key, data, self.cache_timeouts['field_distributions'])
-        return data
-    
-    def _get_cached_age_ranges(self, queryset=None):
-        """Get age ranges with caching - respects filtered queryset"""
-        # Generate cache key that includes queryset info for proper filtering
-        if queryset is None:
-            from django.apps import apps
-            Scene = apps.get_model('scenes_app', 'Scene')
-            queryset = Scene.objects.all()
-            cache_key = self._generate_cache_key('age_ranges', {})
-        else:
-            # Include queryset hash in cache key to ensure filtered data is cached separately
-            queryset_sql = str(queryset.query)
-            cache_key = self._generate_cache_key('age_ranges', {'query_hash': hash(queryset_sql)})
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        # Generate fresh age ranges using the provided queryset
-        age_stats = queryset.aggregate(
-            min_age=Min('effeminate_age'),
-            max_age=Max('effeminate_age')
-        )
-        
-        min_age = age_stats['min_age'] or 18
-        max_age = age_stats['max_age'] or 65
-        
-        # Dynamic range calculation (same as your original)
-        if max_age - min_age <= 20:
-            ranges = {}
-            for start in range(min_age, max_age + 1, 5):
-                end = min(start + 4, max_age)
-                range_key = f"{start}-{end}"
-                count = queryset.filter(
-                    effeminate_age__gte=start,
-                    effeminate_age__lte=end
-                ).count()
-                ranges[range_key] = count
-        else:
-            ranges = {}
-            for start in range(min_age, max_age + 1, 10):
-                end = min(start + 9, max_age)
-                if start == max_age:
-                    range_key = f"{start}+"
-                    count = queryset.filter(effeminate_age__gte=start).count()
-                else:
-                    range_key = f"{start}-{end}"
-                    count = queryset.filter(
-                        effeminate_age__gte=start,
-                        effeminate_age__lte=end
-                    ).count()
-                ranges[range_key] = count
-        
-        cache.set(cache_key, ranges, self.cache_timeouts['age_ranges'])
-        return ranges
-    
-    def _get_cached_details_analysis(self, field_type, queryset=None):
-        """Get details analysis with caching (appearance, hair, clothing) - respects filtered queryset"""
-        # Generate cache key that includes queryset info for proper filtering
-        if queryset is None:
-            cache_key = self._generate_cache_key('details', {'field': field_type})
-        else:
-            queryset_sql = str(queryset.query)
-            cache_key = self._generate_cache_key('details', {
-                'field': field_type,
-                'query_hash': hash(queryset_sql)
-            })
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        # Generate fresh details analysis using optimized cursor approach
-        effeminate_data = Counter()
-        masculine_data = Counter()
-        
-        if queryset is None:
-            sql = "SELECT details FROM scenes_app_scene WHERE details IS NOT NULL"
-        else:
-            # Get IDs from queryset and use in SQL
-            scene_ids = list(queryset.values_list('id', flat=True))
-            if not scene_ids:
-                return {'effeminate': {}, 'masculine': {}}
-            
-            ids_str = ','.join(map(str, scene_ids))
-            sql = f"SELECT details FROM scenes_app_scene WHERE id IN ({ids_str}) AND details IS NOT NULL"
-        
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-            
-            for (details_json,) in cursor.fetchall():
-                if not details_json:
-                    continue
-                
-                try:
-                    details = json.loads(details_json) if isinstance(details_json, str) else details_json
-                    
-                    # Effeminate details
-                    eff_details = details.get('effeminate', {})
-                    if field_type in eff_details:
-                        value = eff_details[field_type].lower().strip()
-                        if value:
-                            effeminate_data[value] += 1
-                    
-                    # Masculine details
-                    masc_details = details.get('masculine', {})
-                    if field_type in masc_details:
-                        value = masc_details[field_type].lower().strip()
-                        if value:
-                            masculine_data[value] += 1
-                            
-                except (json.JSONDecodeError, AttributeError, TypeError):
-                    continue
-        
-        result = {
-            'effeminate': dict(effeminate_data.most_common(10)),
-            'masculine': dict(masculine_data.most_common(10))
-        }
-        
-        cache.set(cache_key, result, self.cache_timeouts['details_analysis'])
-        return result
-    
-    def _get_cached_atmosphere_analysis(self, queryset=None):
-        """Get atmosphere analysis with caching - respects filtered queryset"""
-        # Generate cache key that includes queryset info for proper filtering
-        if queryset is None:
-            cache_key = self._generate_cache_key('atmosphere', {})
-        else:
-            queryset_sql = str(queryset.query)
-            cache_key = self._generate_cache_key('atmosphere', {'query_hash': hash(queryset_sql)})
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        # Generate fresh atmosphere analysis
-        lighting_data = Counter()
-        scent_data = Counter()
-        sound_data = Counter()
-        
-        if queryset is None:
-            sql = "SELECT details FROM scenes_app_scene WHERE details IS NOT NULL"
-        else:
-            scene_ids = list(queryset.values_list('id', flat=True))
-            if not scene_ids:
-                return {'lighting': {}, 'scent': {}, 'sound': {}}
-            
-            ids_str = ','.join(map(str, scene_ids))
-            sql = f"SELECT details FROM scenes_app_scene WHERE id IN ({ids_str}) AND details IS NOT NULL"
-        
-        with connection.cursor() as cursor:
-            cursor.execute(sql)
-            
-            for (details_json,) in cursor.fetchall():
-                if not details_json:
-                    continue
-                
-                try:
-                    details = json.loads(details_json) if isinstance(details_json, str) else details_json
-                    atmosphere = details.get('atmosphere', {})
-                    
-                    for field, counter in [
-                        ('lighting', lighting_data),
-                        ('scent', scent_data),
-                        ('sound', sound_data)
-                    ]:
-                        if field in atmosphere:
-                            value = atmosphere[field].lower().strip()
-                            if value:
-                                counter[value] += 1
-                                
-                except (json.JSONDecodeError, AttributeError, TypeError):
-                    continue
-        
-        result = {
-            'lighting': dict(lighting_data.most_common(10)),
-            'scent': dict(scent_data.most_common(10)),
-            'sound': dict(sound_data.most_common(10))
+    def _format_stats(self, sections):
+        """Headline numbers of one set of sections"""
+        total_scenes = sections['total_scenes']
+        total_favorites = sections['total_favorites']
+        return {
+            'total_scenes': total_scenes,
+            'total_favorites': total_favorites,
+            'avg_effeminate_age': round(sections['avg_effeminate_age'] or 0, 1),
+            'avg_masculine_age': round(sections['avg_masculine_age'] or 0, 1),
+            'favorite_rate': round((total_favorites / total_scenes) * 100, 1) if total_scenes > 0 else 0,
         }
-        
-        cache.set(cache_key, result, self.cache_timeouts['details_analysis'])
-        return result
     
-    def _get_most_favorited_scenes(self, queryset, limit_favorites):
-        """Get most favorited scenes"""
-        most_favorited_query = queryset.annotate(
-            fav_count=Count('favorites')
-        ).filter(fav_count__gt=0).order_by('-fav_count')
-        
-        if limit_favorites and limit_favorites > 0:
-            return list(most_favorited_query[:limit_favorites])
-        else:
-            return list(most_favorited_query)
+    def _chart_section(self, chart):
+        """Key of the sections entry behind ``chart``"""
+        field = CHART_FIELDS.get(chart)
+        return f'{field}_data' if field else chart
     
-    def _calculate_recent_activity(self, total_scenes):
-        """Calculate recent activity (preserved from original)"""
-        if total_scenes == 0:
-            return {'today': 0, 'this_week': 0, 'this_month': 0}
-        
-        recent_threshold = max(1, total_scenes // 10)
-        
-        return {
-            'today': min(recent_threshold // 7, total_scenes),
-            'this_week': min(recent_threshold, total_scenes),
-            'this_month': total_scenes
-        }
+    def _format_charts(self, sections, charts=CHART_SECTIONS):
+        """Chart.js labels/data for the requested ``charts``"""
+        formatted = {}
+        for chart in charts:
+            field = CHART_FIELDS.get(chart)
+            if field:
+                items = sections[self._chart_section(chart)]
+                formatted[chart] = {
+                    'labels': [item[field] for item in items],
+                    'data': [item['count'] for item in items]
+                }
+            else:
+                histogram = sections[chart]
+                formatted[chart] = {
+                    'labels': list(histogram.keys()),
+                    'data': list(histogram.values())
+                }
+        return formatted
     
-    def _get_cached_sync_check(self):
-        """Get sync check with caching"""
-        cache_key = self._generate_cache_key('sync_check', {})
-        
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        # Generate fresh sync check (preserved from original)
+    def _calculate_recent_activity(self):
+        """Favorite and search activity totals and trends from the hourly/daily rollups"""
         try:
-            from django.apps import apps
-            from django.conf import settings
-            import os
-            
-            Scene = apps.get_model('scenes_app', 'Scene')
-            db_count = Scene.objects.count()
-            
-            try:
-                json_path = os.path.join(settings.BASE_DIR, 'scenes.json')
-                with open(json_path, 'r') as f:
-                    json_data = json.load(f)
-                    json_count = len(json_data)
-            except:
-                json_count = 0
-            
-            result = {
-                'db_count': db_count,
-                'json_count': json_count,
-                'synced': db_count == json_count
-            }
+            return activity_rollups.recent_activity()
         except Exception as e:
-            result = {'error': str(e)}
-        
-        cache.set(cache_key, result, self.cache_timeouts['sync_check'])
-        return result
+            logger.warning(f"Activity rollups unavailable: {e}")
+            return {}
+    
+    def _get_cached_sync_check(self):
+        """Get sync status; scenes.json is only re-read in the background when it changed"""
+        return scene_file_sync.status()
     
     def _generate_cache_key(self, prefix, params):
-        """Generate unique cache key from parameters"""
-        key_data = json.dumps(params, sort_keys=True)
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()[:8]
-        return f"analytics_{prefix}_{key_hash}"
+        """Stable cross-process key for normalised parameters, under the prefix's generation"""
+        return cache_keys.key(f'analytics.{prefix}', **params)
+    
+    def _generate_previous_key(self, prefix, params):
+        """Key of the last value cached for these parameters, kept across generations"""
+        return cache_keys.previous_key(f'analytics.{prefix}', **params)
     
     def _empty_analytics_response(self):
         """Return empty response preserving structure"""
@@ -522,7 +379,8 @@ class CachedAnalytics:
                 'countries': {'labels': [], 'data': []},
                 'settings': {'labels': [], 'data': []},
                 'emotions': {'labels': [], 'data': []},
-                'age_ranges': {'labels': [], 'data': []}
+                'age_ranges': {'labels': [], 'data': []},
+                'masculine_age_ranges': {'labels': [], 'data': []}
             },
             
             # Filters object expected by JavaScript for dropdown population
@@ -542,28 +400,27 @@ class CachedAnalytics:
             'setting_data': [],
             'emotion_data': [],
             'age_ranges': {},
+            'masculine_age_ranges': {},
             'appearance_stats': {'effeminate': {}, 'masculine': {}},
             'hair_stats': {'effeminate': {}, 'masculine': {}},
             'clothing_stats': {'effeminate': {}, 'masculine': {}},
             'atmosphere_stats': {'lighting': {}, 'scent': {}, 'sound': {}},
-            'recent_scenes': {'today': 0, 'this_week': 0, 'this_month': 0},
+            'recent_activity': {},
             'favorite_rate': 0
         }
     
     def invalidate_cache(self, cache_type=None):
-        """Invalidate specific or all analytics caches"""
-        if cache_type:
+        """Invalidate specific or all analytics caches by advancing their generation"""
+        if cache_type and cache_type != 'all':
             # Invalidate specific cache type
-            if cache_type == 'all':
-                cache.delete_pattern('analytics_*')
-            else:
-                cache.delete_pattern(f'analytics_{cache_type}_*')
+            if cache_type in self.namespaces:
+                self.namespaces[cache_type].invalidate()
         else:
             # Invalidate all analytics caches
-            cache.delete_pattern('analytics_*')
+            for namespace in self.namespaces.values():
+                namespace.invalidate()
         
-        if self.debug:
-            print(f"🗑️ Cache invalidated: {cache_type or 'all'}")
+        logger.debug(f"Cache invalidated: {cache_type or 'all'}")
 
 # Global instance
 cached_analytics = CachedAnalytics()
\ No newline at end of file
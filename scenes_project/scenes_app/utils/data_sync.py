@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.conf import settings
+from django.utils import timezone
+import hashlib
+import json
+import os
+
+from .cache_versions import cache_versions
+from .single_flight import single_flight
+
+
+# Titles listed per side of the diff; counts are always complete
+MAX_LISTED_TITLES = 50
+
+
+class SceneFileSync:
+    """
+    Compares scenes.json with the scenes table.
+    The request path only stats the file: the stored status is reused while
+    the file's (mtime, size) and the 'scenes' cache version are unchanged.
+    Otherwise the check is redone in the background, hashing the file and
+    re-parsing it only when its digest actually changed.
+    """
+
+    status_key = 'scene_file_sync_status'
+    titles_key = 'scene_file_sync_titles'
+
+    @property
+    def path(self):
+        return os.path.join(settings.BASE_DIR, 'scenes.json')
+
+    def fingerprint(self):
+        """{'mtime_ns', 'size'} of scenes.json, or None when it is missing"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def status(self, wait=False):
+        """
+        Latest sync status. When it is out of date a background refresh is
+        scheduled and the previous status (or a pending placeholder) returned;
+        ``wait`` recomputes in the caller instead.
+        """
+        source = self._source()
+        status = cache.get(self.status_key)
+        if status is not None and status.get('source') == source:
+            return status
+
+        if wait:
+            status = self.check(source)
+            cache.set(self.status_key, status, None)
+            return status
+
+        single_flight.refresh_in_background(self.status_key, lambda: self.check(source), None)
+        if status is not None:
+            return dict(status, stale=True)
+        return {'db_count': None, 'json_count': None, 'synced': None, 'pending': True}
+
+    def check(self, source=None):
+        """Diff file titles against database titles"""
+        from django.apps import apps
+        Scene = apps.get_model('scenes_app', 'Scene')
+
+        source = source or self._source()
+        try:
+            file_info, json_titles = self._file_titles(source['file'])
+        except (OSError, ValueError) as e:
+            return {'error': str(e), 'source': source}
+
+        db_titles = list(Scene.objects.values_list('title', flat=True))
+        json_set, db_set = set(json_titles), set(db_titles)
+        missing = sorted(json_set - db_set)
+        extra = sorted(db_set - json_set)
+
+        return {
+            'db_count': len(db_titles),
+            'json_count': len(json_titles),
+            'synced': len(db_titles) == len(json_titles) and not missing and not extra,
+            'missing_count': len(missing),
+            'extra_count': len(extra),
+            'missing_titles': missing[:MAX_LISTED_TITLES],
+            'extra_titles': extra[:MAX_LISTED_TITLES],
+            'file': file_info,
+            'checked_at': timezone.now().isoformat(),
+            'source': source,
+        }
+
+    def _source(self):
+        return {'file': self.fingerprint(), 'scenes_version': cache_versions.get('scenes')}
+
+    def _file_titles(self, fingerprint):
+        """
+        (file info, titles) of scenes.json. The file is only read when its
+        fingerprint moved, and only re-parsed when its digest changed too.
+        """
+        if fingerprint is None:
+            return None, []
+
+        parsed = cache.get(self.titles_key)
+        if parsed is not None and parsed.get('fingerprint') == fingerprint:
+            return parsed['file'], parsed['titles']
+
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        file_info = dict(fingerprint, digest=digest)
+
+        if parsed is not None and parsed.get('file', {}).get('digest') == digest:
+            titles = parsed['titles']
+        else:
+            titles = [scene.get('title', '') for scene in json.loads(content)]
+
+        cache.set(self.titles_key, {'fingerprint': fingerprint, 'file': file_info, 'titles': titles}, None)
+        return file_info, titles
+
+
+# Global instance
+scene_file_sync = SceneFileSync()
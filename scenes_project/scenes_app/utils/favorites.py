@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.conf import settings
+import hashlib
+import time
+
+
+class SessionFavorites:
+    """
+    Favorite scene ids of a single session.
+    Serves the count, membership checks and filter ids from one set.
+    """
+
+    def __init__(self, session_key, scene_ids=()):
+        self.session_key = session_key
+        self.scene_ids = frozenset(scene_ids)
+
+    def __contains__(self, scene_id):
+        return scene_id in self.scene_ids
+
+    def __iter__(self):
+        return iter(self.scene_ids)
+
+    def __len__(self):
+        return len(self.scene_ids)
+
+    @property
+    def count(self):
+        return len(self.scene_ids)
+
+    @property
+    def ids(self):
+        """Sorted id list, suitable for ``id__in`` filters"""
+        return sorted(self.scene_ids)
+
+    @property
+    def version(self):
+        """Short digest of the id set; changes whenever a favorite is toggled"""
+        key_data = ','.join(map(str, self.ids))
+        return hashlib.md5(key_data.encode()).hexdigest()[:8]
+
+
+class FavoritesService:
+    """
+    Loads a session's favorite ids once per request, backed by a short-lived
+    cache entry. The entry's key embeds a per-session version; changes bump
+    the version instead of rewriting the entry, so neither a concurrent
+    toggle nor a reader that loaded rows before the change can store stale
+    ids where later requests look. FavoriteScene deletes from any path
+    (cascades, admin) bump it through a signal.
+    """
+
+    request_attr = '_session_favorites'
+
+    def __init__(self):
+        self.timeout = getattr(settings, 'FAVORITES_CACHE_TIMEOUT', 300)
+
+    def for_request(self, request):
+        """Return the SessionFavorites for this request, loading it at most once"""
+        session_key = request.session.session_key
+        favorites = getattr(request, self.request_attr, None)
+        if favorites is not None and favorites.session_key == session_key:
+            return favorites
+
+        favorites = self.load(session_key)
+        setattr(request, self.request_attr, favorites)
+        return favorites
+
+    def load(self, session_key):
+        """Get favorites for a session from cache, falling back to the database"""
+        if not session_key:
+            return SessionFavorites(session_key)
+
+        # Read before the rows: a change landing meanwhile moves the version,
+        # so what is stored below goes to a key no one reads any more
+        cache_key = self._cache_key(session_key, self._version(session_key))
+        scene_ids = cache.get(cache_key)
+        if scene_ids is None:
+            from django.apps import apps
+            FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+            scene_ids = list(FavoriteScene.objects.filter(
+                session_key=session_key
+            ).values_list('scene_id', flat=True))
+            cache.set(cache_key, scene_ids, self.timeout)
+
+        return SessionFavorites(session_key, scene_ids)
+
+    def add(self, request, scene_id):
+        """Record a newly added favorite in the request copy and orphan the cached one"""
+        favorites = self.for_request(request)
+        return self._store(request, favorites.scene_ids | {scene_id})
+
+    def remove(self, request, scene_id):
+        """Record a removed favorite in the request copy and orphan the cached one"""
+        favorites = self.for_request(request)
+        return self._store(request, favorites.scene_ids - {scene_id})
+
+    def invalidate(self, session_key):
+        """Orphan the cached favorites of a session by moving its version"""
+        if not session_key:
+            return
+        try:
+            cache.incr(self._version_key(session_key))
+        except ValueError:
+            # No version yet or it expired; the next read starts a fresh one
+            pass
+
+    def _store(self, request, scene_ids):
+        session_key = request.session.session_key
+        favorites = SessionFavorites(session_key, scene_ids)
+        setattr(request, self.request_attr, favorites)
+        self.invalidate(session_key)
+        return favorites
+
+    def _version(self, session_key):
+        version_key = self._version_key(session_key)
+        version = cache.get(version_key)
+        if version is None:
+            # Millisecond clock keeps a re-created version ahead of older ones
+            version = int(time.time() * 1000)
+            if not cache.add(version_key, version, self.timeout):
+                version = cache.get(version_key, version)
+        return version
+
+    def _version_key(self, session_key):
+        return f"favorites_session_{session_key}:version"
+
+    def _cache_key(self, session_key, version):
+        return f"favorites_session_{session_key}:v{version}"
+
+
+# Global instance
+session_favorites = FavoritesService()
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from types import GeneratorType
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Encoded text gathered before a chunk is sent
+CHUNK_SIZE = 8192
+
+
+def iter_json_object(sections, encoder):
+    """
+    JSON text of an object built from ``(key, value)`` pairs, in fragments.
+    Sections are pulled one at a time, and list, tuple and generator values
+    are encoded item by item, so only one item is ever encoded at once.
+
+    The status line is already sent when a section fails, so the failure is
+    logged and the object is closed with an 'error' key instead of being
+    cut off mid-text.
+    """
+    yield '{'
+    written = False
+    try:
+        for key, value in sections:
+            fragments = iter_json_value(value, encoder)
+            # A scalar is encoded whole before its key goes out, a list up to '['
+            first = next(fragments)
+            yield f"{', ' if written else ''}{encoder.encode(str(key))}: {first}"
+            written = True
+            yield from fragments
+    except Exception as e:
+        logger.exception("Streaming JSON response failed")
+        if written:
+            yield ', '
+        yield '"error": '
+        yield encoder.encode(str(e))
+    yield '}'
+
+
+def iter_json_value(value, encoder):
+    if not isinstance(value, (list, tuple, GeneratorType)):
+        yield encoder.encode(value)
+        return
+    yield '['
+    try:
+        for index, item in enumerate(value):
+            yield f"{', ' if index else ''}{encoder.encode(item)}"
+    except Exception:
+        # Items are encoded whole, so closing the list keeps the text valid
+        yield ']'
+        raise
+    yield ']'
+
+
+def chunked(fragments, size=CHUNK_SIZE):
+    """Join text fragments into encoded chunks of about ``size`` bytes"""
+    buffer, buffered = [], 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= size:
+            yield ''.join(buffer).encode()
+            buffer, buffered = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """
+    JSON object response written while ``sections`` is consumed.
+    ``sections`` yields ``(key, value)`` pairs, usually from a generator, so
+    values can be produced lazily and the full text is never built; the
+    result decodes to what JsonResponse would send for the same pairs.
+    Only worth it for rows read lazily; payloads already in memory go out
+    as a JsonResponse. Errors raised while streaming end the object with an
+    'error' key (see iter_json_object), not a 500.
+    """
+
+    def __init__(self, sections, encoder=DjangoJSONEncoder, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(chunked(iter_json_object(sections, encoder())), **kwargs)
+
+
+def json_sections_response(sections, **kwargs):
+    """StreamingJsonResponse, or a JsonResponse when STREAMING_JSON_RESPONSES is off"""
+    if getattr(settings, 'STREAMING_JSON_RESPONSES', True):
+        return StreamingJsonResponse(sections, **kwargs)
+    return JsonResponse(
+        {key: list(value) if isinstance(value, GeneratorType) else value for key, value in sections},
+        **kwargs
+    )
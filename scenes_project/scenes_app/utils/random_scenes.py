@@ -0,0 +1,259 @@
+from array import array
+from bisect import bisect_right
+import hashlib
+import heapq
+import random
+import threading
+
+from .cache_versions import cache_versions
+
+
+# Columns returned by the random scene API
+RANDOM_SCENE_FIELDS = (
+    'id', 'title', 'effeminate_age', 'masculine_age',
+    'country', 'setting', 'emotion', 'details', 'full_text',
+)
+
+# Facets a random batch can be filtered on (matched case-insensitively)
+RANDOM_FACETS = ('country', 'setting', 'emotion')
+
+# Upper bound for a single batch request
+MAX_RANDOM_BATCH = 50
+
+# Sampling tables kept per worker before the oldest are dropped
+MAX_SAMPLING_TABLES = 64
+
+# Session key holding the per-session random stream state
+RANDOM_STREAM_SESSION_KEY = 'random_stream'
+
+# Feistel rounds used to derive the per-session permutation
+PERMUTATION_ROUNDS = 4
+
+
+def permute_index(index, domain, seed):
+    """
+    Map ``index`` in [0, domain) to a unique position in [0, domain).
+    A keyed Feistel network over the next even power of two, cycle-walked
+    back into range, gives a seeded permutation without materialising it.
+    """
+    bits = max(2, (domain - 1).bit_length())
+    bits += bits % 2
+    half = bits // 2
+    mask = (1 << half) - 1
+    seed_bytes = str(seed).encode()
+
+    value = index
+    while True:
+        left, right = value >> half, value & mask
+        for round_number in range(PERMUTATION_ROUNDS):
+            digest = hashlib.blake2b(
+                b'%d:%d' % (round_number, right), key=seed_bytes[:64], digest_size=8
+            ).digest()
+            left, right = right, left ^ (int.from_bytes(digest, 'big') & mask)
+        value = (left << half) | right
+        if value < domain:
+            return value
+
+
+class RandomSceneService:
+    """
+    Constant-time random scene selection.
+    Scene ids are held per worker in a compact array('q') and only reloaded
+    when the 'scenes' cache version moves. Facet postings and favorite counts
+    sit alongside, so filtered and favorite-weighted batches are sampled
+    without replacement from cached tables rather than the database.
+    """
+
+    def __init__(self):
+        self._ids = array('q')
+        self._facets = {}
+        self._version = None
+        self._favorite_counts = None
+        self._favorites_version = None
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def scene_ids(self):
+        """Current id array, refreshed if the corpus changed"""
+        version = cache_versions.get('scenes')
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._load_index()
+                    self._version = version
+                    self._favorites_version = None
+                    self._tables = {}
+        return self._ids
+
+    def random_id(self):
+        """Random scene id, or None when there are no scenes"""
+        ids = self.scene_ids()
+        if not ids:
+            return None
+        return ids[random.randrange(len(ids))]
+
+    def next_in_stream(self, session):
+        """
+        Next scene id of the session's non-repeating random stream.
+        The session stores only a seed, a cursor and the 'scenes' version of the
+        current cycle; the cursor runs through a seeded permutation of the id
+        array positions, so each step is one array lookup. When the version
+        moves the cycle restarts over the new array, so deleted scenes are never
+        returned; no id repeats within a cycle.
+        """
+        ids = self.scene_ids()
+        version = self._version
+        if not ids:
+            return None
+
+        state = session.get(RANDOM_STREAM_SESSION_KEY) or {}
+        seed = state.get('seed')
+        cursor = state.get('cursor', 0)
+        if seed is None or state.get('version') != version or cursor >= len(ids):
+            seed = random.getrandbits(63)
+            cursor = 0
+
+        scene_id = ids[permute_index(cursor, len(ids), seed)]
+        session[RANDOM_STREAM_SESSION_KEY] = {'seed': seed, 'cursor': cursor + 1, 'version': version}
+        return scene_id
+
+    def random_scene(self, fields=RANDOM_SCENE_FIELDS, filters=None, weighted=False):
+        """Random scene as a dict of ``fields``, hydrated with a single query"""
+        scenes = self.random_batch(1, fields=fields, filters=filters, weighted=weighted)
+        return scenes[0] if scenes else None
+
+    def random_batch(self, count, fields=RANDOM_SCENE_FIELDS, filters=None, weighted=False):
+        """
+        Up to ``count`` distinct random scenes as dicts, in sampled order.
+        ``filters`` maps RANDOM_FACETS to values; ``weighted`` makes scenes with
+        more favorites proportionally more likely (every scene keeps weight >= 1).
+        """
+        from django.apps import apps
+        Scene = apps.get_model('scenes_app', 'Scene')
+
+        # Retry once in case picked rows were deleted before the version bump landed
+        for _ in range(2):
+            scene_ids = self.sample_ids(count, filters=filters, weighted=weighted)
+            if not scene_ids:
+                return []
+            rows = {
+                row['id']: row
+                for row in Scene.objects.filter(id__in=scene_ids).values(*fields)
+            }
+            if len(rows) == len(scene_ids):
+                break
+            self._version = None
+        return [rows[scene_id] for scene_id in scene_ids if scene_id in rows]
+
+    def sample_ids(self, count, filters=None, weighted=False):
+        """Sample up to ``count`` distinct scene ids without replacement"""
+        ids, cumulative = self._sampling_table(filters, weighted)
+        count = min(count, len(ids))
+        if count <= 0:
+            return []
+
+        if cumulative is None:
+            return [ids[i] for i in random.sample(range(len(ids)), count)]
+        return [ids[i] for i in self._weighted_sample(cumulative, count)]
+
+    def _weighted_sample(self, cumulative, count):
+        """Successive weighted draws without replacement over cumulative weights"""
+        total = cumulative[-1]
+        if count * 2 <= len(cumulative):
+            # Sparse draw: bisect the cumulative table, rejecting repeats
+            chosen = []
+            seen = set()
+            attempts = 0
+            while len(chosen) < count and attempts < count * 20:
+                attempts += 1
+                i = bisect_right(cumulative, random.random() * total)
+                i = min(i, len(cumulative) - 1)
+                if i not in seen:
+                    seen.add(i)
+                    chosen.append(i)
+            if len(chosen) == count:
+                return chosen
+
+        # Dense draw: Efraimidis-Spirakis keys give the same distribution in one pass
+        def key(i):
+            weight = cumulative[i] - (cumulative[i - 1] if i else 0.0)
+            return random.random() ** (1.0 / weight)
+
+        return heapq.nlargest(count, range(len(cumulative)), key=key)
+
+    def _sampling_table(self, filters, weighted):
+        """(ids, cumulative weights or None) for a filter set, cached per worker"""
+        ids = self.scene_ids()
+        filter_items = tuple(sorted(
+            (facet, str(value).strip().lower())
+            for facet, value in (filters or {}).items()
+            if facet in RANDOM_FACETS and value and value != 'all'
+        ))
+        favorite_counts = self._get_favorite_counts() if weighted else None
+
+        table_key = (filter_items, weighted, self._favorites_version if weighted else None)
+        table = self._tables.get(table_key)
+        if table is not None:
+            return table
+
+        if filter_items:
+            postings = [self._facets.get(item, array('l')) for item in filter_items]
+            positions = set(postings[0]).intersection(*postings[1:])
+            positions = sorted(positions)
+        else:
+            positions = range(len(ids))
+
+        table_ids = array('q', (ids[p] for p in positions))
+        cumulative = None
+        if weighted:
+            cumulative = array('d')
+            total = 0.0
+            for p in positions:
+                total += 1 + favorite_counts[p]
+                cumulative.append(total)
+
+        if len(self._tables) >= MAX_SAMPLING_TABLES:
+            self._tables.pop(next(iter(self._tables)))
+        self._tables[table_key] = (table_ids, cumulative)
+        return table_ids, cumulative
+
+    def _get_favorite_counts(self):
+        """Favorite count per id position, refreshed on the 'favorites' version"""
+        version = cache_versions.get('favorites')
+        if version != self._favorites_version:
+            with self._lock:
+                if version != self._favorites_version:
+                    from django.apps import apps
+                    from django.db.models import Count
+                    FavoriteScene = apps.get_model('scenes_app', 'FavoriteScene')
+
+                    positions = {scene_id: i for i, scene_id in enumerate(self._ids)}
+                    counts = array('l', [0]) * len(self._ids)
+                    for row in (FavoriteScene.objects.values('scene_id')
+                                .annotate(count=Count('id')).order_by()):
+                        position = positions.get(row['scene_id'])
+                        if position is not None:
+                            counts[position] = row['count']
+                    self._favorite_counts = counts
+                    self._favorites_version = version
+        return self._favorite_counts
+
+    def _load_index(self):
+        """Load ids and facet postings (value -> id positions) in one query"""
+        from django.apps import apps
+        Scene = apps.get_model('scenes_app', 'Scene')
+
+        ids = array('q')
+        facets = {}
+        rows = Scene.objects.order_by('id').values_list('id', *RANDOM_FACETS)
+        for position, (scene_id, *values) in enumerate(rows):
+            ids.append(scene_id)
+            for facet, value in zip(RANDOM_FACETS, values):
+                key = (facet, (value or '').strip().lower())
+                facets.setdefault(key, array('l')).append(position)
+        self._ids = ids
+        self._facets = facets
+
+
+# Global instance
+random_scenes = RandomSceneService()
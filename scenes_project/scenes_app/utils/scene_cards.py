@@ -0,0 +1,140 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from collections import defaultdict
+from django.db.models import Count
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+
+
+# Scalar columns every card needs
+CARD_FIELDS = (
+    'id', 'title', 'country', 'setting', 'emotion',
+    'effeminate_age', 'masculine_age',
+)
+
+# (section, key) pairs of the details JSON shown on a card
+CARD_DETAILS = (
+    ('effeminate', 'appearance'),
+    ('masculine', 'appearance'),
+    ('atmosphere', 'lighting'),
+    ('atmosphere', 'scent'),
+)
+
+
+class SceneCard(NamedTuple):
+    """Lightweight, read-only stand-in for a Scene on listing pages"""
+    id: int
+    title: str
+    country: str
+    setting: str
+    emotion: str
+    effeminate_age: int
+    masculine_age: int
+    details: Optional[Dict[str, Dict[str, Any]]] = None
+    primary_image: Optional[Any] = None
+    image_count: int = 0
+    favorite_count: int = 0
+
+    @property
+    def pk(self):
+        return self.id
+
+
+def _details_alias(section, key):
+    return f"details_{section}_{key}"
+
+
+def card_queryset(queryset, details=True, favorite_count=False):
+    """
+    Project a Scene queryset down to card columns.
+    full_text and the details blob are never loaded; only the details keys
+    listed in CARD_DETAILS are extracted in SQL when ``details`` is set.
+    """
+    annotations = {}
+    if details:
+        for section, key in CARD_DETAILS:
+            annotations[_details_alias(section, key)] = KeyTextTransform(
+                key, KeyTransform(section, 'details')
+            )
+    if favorite_count:
+        annotations['favorite_count'] = Count('favorites')
+
+    return queryset.values(*CARD_FIELDS, **annotations)
+
+
+def hydrate_cards(rows: Iterable[Dict[str, Any]], images=True) -> List[SceneCard]:
+    """Build SceneCards from card_queryset rows, batch-loading images if asked"""
+    rows = list(rows)
+
+    image_map = _load_card_images([row['id'] for row in rows]) if images and rows else {}
+
+    cards = []
+    for row in rows:
+        details = {}
+        for section, key in CARD_DETAILS:
+            value = row.get(_details_alias(section, key))
+            if value is not None:
+                details.setdefault(section, {})[key] = value
+
+        primary_image, image_count = image_map.get(row['id'], (None, 0))
+        cards.append(SceneCard(
+            id=row['id'],
+            title=row['title'],
+            country=row['country'],
+            setting=row['setting'],
+            emotion=row['emotion'],
+            effeminate_age=row['effeminate_age'],
+            masculine_age=row['masculine_age'],
+            details=details,
+            primary_image=primary_image,
+            image_count=image_count,
+            favorite_count=row.get('favorite_count', 0),
+        ))
+    return cards
+
+
+def paginate_cards(page_obj, images=True):
+    """Replace a page's projected rows with SceneCards in place"""
+    page_obj.object_list = hydrate_cards(page_obj.object_list, images=images)
+    return page_obj
+
+
+def cache_paginator_count(paginator, namespace, *key_parts):
+    """Take the paginator's total from ``namespace``, counting only on a miss"""
+    from .tiered_cache import tiered_cache
+
+    key = namespace.key(*key_parts, 'count')
+    count = tiered_cache.get(key)
+    if count is None:
+        tiered_cache.set(key, paginator.count, namespace.timeout)
+    else:
+        paginator.count = count
+    return paginator
+
+
+def cache_page_rows(page_obj, namespace, *key_parts):
+    """Serve a page's card_queryset rows from ``namespace``, filling it on a miss"""
+    from .tiered_cache import tiered_cache
+
+    key = namespace.key(*key_parts, page_obj.paginator.per_page, page_obj.number)
+    rows = tiered_cache.get(key)
+    if rows is None:
+        rows = list(page_obj.object_list)
+        tiered_cache.set(key, rows, namespace.timeout)
+    page_obj.object_list = rows
+    return page_obj
+
+
+def _load_card_images(scene_ids):
+    """Return {scene_id: (primary_image, image_count)} using a single query"""
+    from django.apps import apps
+    SceneImage = apps.get_model('scenes_app', 'SceneImage')
+
+    images_by_scene = defaultdict(list)
+    for image in SceneImage.objects.filter(scene_id__in=scene_ids):
+        images_by_scene[image.scene_id].append(image)
+
+    image_map = {}
+    for scene_id, images in images_by_scene.items():
+        # Same fallback as Scene.primary_image: flagged image, else first by order
+        primary = next((image for image in images if image.is_primary), images[0])
+        image_map[scene_id] = (primary, len(images))
+    return image_map
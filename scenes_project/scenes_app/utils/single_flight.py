@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import cache
+from django.db import close_old_connections
+import logging
+import threading
+import time
+import uuid
+
+from .cache_stats import cache_stats
+from .tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a regeneration lock is held before another worker may take over
+LOCK_LEASE = 15
+
+# Seconds a follower waits for the leader's result before computing itself
+FOLLOWER_WAIT = 5
+
+# Seconds between follower polls of the result key
+FOLLOWER_POLL = 0.05
+
+# Threads per worker process running stale-while-revalidate refreshes
+REFRESH_THREADS = 2
+
+
+class SingleFlight:
+    """
+    Lets one worker at a time regenerate a missing cache entry.
+    The leader takes a short-lease lock with cache.add (SET NX EX on Redis);
+    followers are served the previous value when one is kept, otherwise they
+    poll for the leader's result and only compute themselves if the lease
+    runs out without one.
+
+    With a ``soft_timeout`` the entry is stored with a freshness deadline:
+    past it the cached value is still returned at once while a single
+    background refresh recomputes it; ``timeout`` remains the hard expiry.
+
+    Values are read and written through tiered_cache, so keys of locally
+    cached namespaces are served from worker memory; locks always live in
+    the shared cache.
+    """
+
+    def __init__(self, lease=LOCK_LEASE, wait=FOLLOWER_WAIT, poll=FOLLOWER_POLL):
+        self.lease = lease
+        self.wait = wait
+        self.poll = poll
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def fetch(self, key, compute, timeout, previous_key=None, cacheable=None, soft_timeout=None):
+        """
+        Return (value, source) for ``key``; source is 'memory', 'cache',
+        'stale', 'computed', 'previous' or 'waited'. ``compute`` runs at most once
+        across workers while the lock is held; values failing ``cacheable``
+        are not stored.
+        """
+        entry, tier = tiered_cache.lookup(key)
+        if entry is not None:
+            value, fresh_until = self._unpack(entry, soft_timeout)
+            if fresh_until is not None and time.time() >= fresh_until and tier == 'memory':
+                # Another worker may already have refreshed the shared entry
+                entry, tier = tiered_cache.lookup(key, local=False)
+                if entry is not None:
+                    value, fresh_until = self._unpack(entry, soft_timeout)
+            if fresh_until is not None and time.time() >= fresh_until:
+                self.refresh_in_background(key, compute, timeout, previous_key, cacheable, soft_timeout)
+                self._record(key, 'stale_served')
+                return value, 'stale'
+            return value, 'memory' if tier == 'memory' else 'cache'
+
+        token = self._acquire(key)
+        if token:
+            try:
+                return self._compute_and_store(key, compute, timeout, previous_key, cacheable, soft_timeout), 'computed'
+            finally:
+                self._release(key, token)
+
+        if previous_key:
+            value = cache.get(previous_key)
+            if value is not None:
+                self._record(key, 'previous_served')
+                return value, 'previous'
+
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            time.sleep(self.poll)
+            entry = tiered_cache.get(key, local=False)
+            if entry is not None:
+                self._record(key, 'waited')
+                return self._unpack(entry, soft_timeout)[0], 'waited'
+            if cache.get(self._lock_key(key)) is None:
+                # Leader finished without storing (error) or its lease ran out
+                break
+
+        return self._compute_and_store(key, compute, timeout, previous_key, cacheable, soft_timeout), 'computed'
+
+    def refresh_in_background(self, key, compute, timeout, previous_key=None, cacheable=None, soft_timeout=None):
+        """Recompute a stale entry on the refresh pool unless another worker already is"""
+        token = self._acquire(key)
+        if not token:
+            return
+
+        def refresh():
+            try:
+                self._compute_and_store(key, compute, timeout, previous_key, cacheable, soft_timeout)
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {str(e)}")
+            finally:
+                self._release(key, token)
+                close_old_connections()
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(REFRESH_THREADS, thread_name_prefix='cache-refresh')
+        self._executor.submit(refresh)
+
+    def _compute_and_store(self, key, compute, timeout, previous_key, cacheable, soft_timeout=None):
+        started = time.perf_counter()
+        value = compute()
+        self._record(key, 'regenerations')
+        self._record(key, 'regeneration_ms', round((time.perf_counter() - started) * 1000))
+        if cacheable is None or cacheable(value):
+            entry = value
+            if soft_timeout:
+                entry = {'value': value, 'fresh_until': time.time() + soft_timeout}
+            tiered_cache.set(key, entry, timeout)
+            if previous_key:
+                cache.set(previous_key, value, timeout)
+        return value
+
+    def _unpack(self, entry, soft_timeout):
+        """(value, fresh_until) of a stored entry; fresh_until is None without a soft TTL"""
+        if soft_timeout and isinstance(entry, dict) and 'fresh_until' in entry:
+            return entry['value'], entry['fresh_until']
+        return entry, None
+
+    def _record(self, key, metric, amount=1):
+        namespace = tiered_cache.namespace_of(key)
+        if namespace is not None:
+            cache_stats.record(namespace.name, metric, amount)
+
+    def _acquire(self, key):
+        token = uuid.uuid4().hex
+        return token if cache.add(self._lock_key(key), token, self.lease) else None
+
+    def _release(self, key, token):
+        if cache.get(self._lock_key(key)) == token:
+            cache.delete(self._lock_key(key))
+
+    def _lock_key(self, key):
+        return f"lock:{key}"
+
+
+# Global instance
+single_flight = SingleFlight()
@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+import threading
+import time
+
+from .cache_codec import cache_codec
+from .cache_stats import cache_stats
+
+
+class LocalCache:
+    """Bounded, thread-safe LRU of values with a TTL, held in this worker's memory"""
+
+    def __init__(self, max_entries=256, timeout=60):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        """Store ``value``; ``timeout`` can only shorten the local TTL"""
+        if timeout is None or timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+        timeout = min(timeout, self.timeout)
+        if timeout <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def count_prefix(self, prefix):
+        """Number of held (possibly expired) entries whose key starts with ``prefix``"""
+        with self._lock:
+            return sum(1 for key in self._entries if key.startswith(prefix))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache:
+    """
+    Per-worker LocalCache (L1) in front of the shared Django cache (L2).
+    Only generation-scoped keys (``<name>:g<generation>:...``) of namespaces
+    registered with ``local`` set are held in L1. Invalidation moves the
+    generation, so stale L1 entries are never asked for again and age out
+    through their TTL or the LRU bound. Every other key goes straight to L2.
+    Lookups and stores of namespaced keys are counted in cache_stats.
+
+    L1 hands out the stored object itself: callers must not mutate values.
+    """
+
+    def __init__(self):
+        self.local = LocalCache(
+            getattr(settings, 'LOCAL_CACHE_MAX_ENTRIES', 256),
+            getattr(settings, 'LOCAL_CACHE_TIMEOUT', 60),
+        )
+        self._namespaces = {}
+
+    def register(self, namespace):
+        """Track a CacheNamespace; its keys are held in L1 when ``namespace.local`` is set"""
+        self._namespaces[namespace.name] = namespace
+
+    def namespaces(self):
+        return list(self._namespaces.values())
+
+    def namespace_of(self, key):
+        """CacheNamespace owning a generation-scoped ``key``, else None"""
+        name, _, rest = key.partition(':')
+        namespace = self._namespaces.get(name)
+        if namespace is not None and rest.startswith('g'):
+            return namespace
+        return None
+
+    def is_local(self, key):
+        namespace = self.namespace_of(key)
+        return namespace is not None and namespace.local
+
+    def lookup(self, key, local=True):
+        """(value, tier) where tier is 'memory', 'redis' or None on a miss"""
+        namespace = self.namespace_of(key)
+        name = namespace.name if namespace else None
+
+        if local and namespace is not None and namespace.local:
+            value = self.local.get(key)
+            if value is not None:
+                cache_stats.record(name, 'memory_hits')
+                return value, 'memory'
+
+        value = cache.get(key)
+        if value is None:
+            cache_stats.record(name, 'misses')
+            return None, None
+        if namespace is not None and namespace.local:
+            self.local.set(key, value)
+        cache_stats.record(name, 'redis_hits')
+        return value, 'redis'
+
+    def get(self, key, local=True):
+        return self.lookup(key, local)[0]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        namespace = self.namespace_of(key)
+        if namespace is None:
+            cache.set(key, value, timeout)
+            return
+        # The payload size is the cache serializer's own output (see CodecSerializer)
+        cache_codec.measure()
+        cache.set(key, value, timeout)
+        if namespace.local:
+            self.local.set(key, value, timeout)
+        cache_stats.record(namespace.name, 'stores')
+        size = cache_codec.encoded_size()
+        if size is not None:
+            cache_stats.record(namespace.name, 'payload_bytes', size)
+
+    def delete(self, key):
+        cache.delete(key)
+        self.local.delete(key)
+
+
+# Global instance
+tiered_cache = TieredCache()
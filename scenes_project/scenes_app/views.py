@@ -1,8 +1,11 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from functools import wraps
 from django.core.paginator import Paginator, Page
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
 from django.contrib import messages
 from django.shortcuts import get_object_or_404, render, redirect
 from django.template.loader import render_to_string
@@ -12,13 +15,25 @@ from django.db import models
 from rest_framework.views import APIView
 from rest_framework.response import Response
 import random
+import hashlib
 import json
 import os
 import sys
+import time
 from django.conf import settings
 
 from .models import Scene, FavoriteScene, SearchSuggestion, SearchQuery, SceneImage
-from .utils.cached_analytics import cached_analytics
+from .utils.analytics_aggregates import analytics_aggregates
+from .utils.cached_analytics import cached_analytics, MAX_COMPARISON_SETS
+from .utils.favorites import session_favorites
+from .utils.json_stream import json_sections_response
+from .utils.scene_cards import card_queryset, paginate_cards, cache_paginator_count, cache_page_rows
+from .utils.cache_keys import cache_keys
+from .utils.cache_namespaces import listing_cache, search_cache
+from .utils.cache_stats import cache_stats
+from .utils.cache_versions import cache_versions
+from .utils.random_scenes import random_scenes, RANDOM_FACETS, MAX_RANDOM_BATCH
+from .utils.tiered_cache import tiered_cache
 
 import logging
 logger = logging.getLogger(__name__)
@@ -28,6 +43,54 @@ def is_ajax(request: HttpRequest) -> bool:
     return request.headers.get('x-requested-with') == 'XMLHttpRequest'
 
 
+def _build_etag(*parts) -> str:
+    key_data = ':'.join(map(str, parts))
+    return hashlib.md5(key_data.encode()).hexdigest()[:16]
+
+
+def listing_etag(request: HttpRequest, *args, **kwargs) -> Optional[str]:
+    """ETag for AJAX listing fragments: corpus version + session favorites version"""
+    if not is_ajax(request) or not request.session.session_key:
+        return None
+    if request.GET.get('random', 'false').lower() == 'true':
+        return None
+    favorites = session_favorites.for_request(request)
+    return _build_etag('listing', cache_versions.get('scenes'), favorites.version)
+
+
+def scene_detail_etag(request: HttpRequest, pk: int) -> Optional[str]:
+    """ETag for the detail page, which also shows the global favorite count"""
+    if not request.session.session_key:
+        return None
+    favorites = session_favorites.for_request(request)
+    scenes_version, favorites_version = cache_versions.get_many('scenes', 'favorites')
+    return _build_etag('detail', pk, scenes_version, favorites_version, favorites.version)
+
+
+def scene_content_etag(request: HttpRequest, pk: int) -> str:
+    """ETag for per-scene API payloads that only change with the corpus"""
+    return _build_etag('content', pk, cache_versions.get('scenes'))
+
+
+def etag_conditional(etag_func):
+    """
+    condition() that answers a matching If-None-Match with 304 before the view
+    runs, and asks clients to revalidate since responses are session-dependent
+    """
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func)(view_func)
+
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
+
+
+@etag_conditional(listing_etag)
 def scene_list(request: HttpRequest) -> HttpResponse:
     page_number = request.GET.get('page', '1')
     page_size = int(request.GET.get('page_size', '10'))
@@ -43,12 +106,12 @@ def scene_list(request: HttpRequest) -> HttpResponse:
     if not request.session.session_key:
         request.session.create()
     
+    # Get user's favorite scene IDs for this session
+    user_favorites = session_favorites.for_request(request)
+    
     if favorites_only:
         # Show only favorite scenes for this session
-        favorite_scene_ids = FavoriteScene.objects.filter(
-            session_key=request.session.session_key
-        ).values_list('scene_id', flat=True)
-        scenes_qs = Scene.objects.filter(id__in=favorite_scene_ids)
+        scenes_qs = Scene.objects.filter(id__in=user_favorites.ids)
     elif random_order:
         # Get all scene IDs and shuffle them
         scene_ids = list(Scene.objects.values_list('id', flat=True))
@@ -61,7 +124,13 @@ def scene_list(request: HttpRequest) -> HttpResponse:
     else:
         scenes_qs = Scene.objects.all()
         
-    paginator = Paginator(scenes_qs, page_size)
+    # Only hydrate the columns the scene cards display
+    paginator = Paginator(card_queryset(scenes_qs), page_size)
+    
+    # The plain listing is the same for everyone, so its count and page rows are cached
+    cache_listing = not favorites_only and not random_order
+    if cache_listing:
+        cache_paginator_count(paginator, listing_cache, 'scene_list')
     
     # Handle invalid page numbers gracefully - redirect to last page if page is too high
     try:
@@ -71,11 +140,9 @@ def scene_list(request: HttpRequest) -> HttpResponse:
             page_obj = paginator.get_page(paginator.num_pages)
     except Exception:
         page_obj: Page = paginator.get_page(1)
-
-    # Get user's favorite scene IDs for this session
-    user_favorites = set(FavoriteScene.objects.filter(
-        session_key=request.session.session_key
-    ).values_list('scene_id', flat=True))
+    if cache_listing:
+        cache_page_rows(page_obj, listing_cache, 'scene_list')
+    paginate_cards(page_obj)
 
     # Calculate pagination range for numbered links
     current_page = page_obj.number
@@ -99,7 +166,7 @@ def scene_list(request: HttpRequest) -> HttpResponse:
         'random_order': random_order,
         'favorites_only': favorites_only,
         'user_favorites': user_favorites,
-        'total_favorites': len(user_favorites),
+        'total_favorites': user_favorites.count,
     }
 
     # Return JSON for AJAX requests
@@ -121,6 +188,7 @@ def scene_list(request: HttpRequest) -> HttpResponse:
     return render(request, 'scene_list.html', context)
 
 
+@etag_conditional(scene_detail_etag)
 def scene_detail(request: HttpRequest, pk: int) -> HttpResponse:
     scene = get_object_or_404(Scene, pk=pk)
     
@@ -129,10 +197,7 @@ def scene_detail(request: HttpRequest, pk: int) -> HttpResponse:
         request.session.create()
     
     # Check if this scene is favorited by the current session
-    is_favorited = FavoriteScene.objects.filter(
-        scene=scene,
-        session_key=request.session.session_key
-    ).exists()
+    is_favorited = scene.id in session_favorites.for_request(request)
     
     context = {
         'scene': scene,
@@ -144,12 +209,11 @@ def scene_detail(request: HttpRequest, pk: int) -> HttpResponse:
 
 
 def random_scene(request: HttpRequest) -> HttpResponse:
-    """Redirect to a random scene detail page"""
-    scene_ids = list(Scene.objects.values_list('id', flat=True))
-    if not scene_ids:
+    """Redirect to the next scene of this session's non-repeating random stream"""
+    random_id = random_scenes.next_in_stream(request.session)
+    if random_id is None:
         return render(request, 'scene_list.html', {'page_obj': None, 'error': 'No scenes available'})
     
-    random_id = random.choice(scene_ids)
     return redirect('scene_detail', pk=random_id)
 
 
@@ -314,6 +378,14 @@ def analytics_api(request: HttpRequest) -> JsonResponse:
     """Cached API endpoint for analytics data"""
     try:
         chart_limit = int(request.GET.get('chart_limit', 0))
+        # most_favorited is bounded by default; favorites_limit=all asks for every favorited scene
+        favorites_limit = request.GET.get('favorites_limit')
+        if favorites_limit == 'all':
+            limit_favorites = 0
+        elif favorites_limit and favorites_limit.isdigit() and int(favorites_limit) > 0:
+            limit_favorites = int(favorites_limit)
+        else:
+            limit_favorites = None
         
         # Get filters
         filters = {}
@@ -325,7 +397,7 @@ def analytics_api(request: HttpRequest) -> JsonResponse:
         # Use cached analytics
         analytics_data = cached_analytics.analyze_scenes_cached(
             limit_charts=chart_limit,
-            limit_favorites=0,
+            limit_favorites=limit_favorites,
             filters=filters if filters else None
         )
         
@@ -342,7 +414,70 @@ def analytics_api(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def analytics_compare_api(request: HttpRequest) -> JsonResponse:
+    """
+    Stats for several filter sets in one request, for the comparison view.
+    ``sets`` is a JSON list of filter objects; ``charts`` optionally names
+    chart sections (countries, settings, emotions, age_ranges, ...) to include.
+    """
+    try:
+        filter_sets = json.loads(request.GET.get('sets', '[]'))
+    except ValueError:
+        return JsonResponse({'error': 'sets must be a JSON list of filter objects'}, status=400)
+    
+    if not isinstance(filter_sets, list) or not all(isinstance(filters, dict) for filters in filter_sets):
+        return JsonResponse({'error': 'sets must be a JSON list of filter objects'}, status=400)
+    if not 1 <= len(filter_sets) <= MAX_COMPARISON_SETS:
+        return JsonResponse({'error': f'Between 1 and {MAX_COMPARISON_SETS} filter sets can be compared'}, status=400)
+    
+    try:
+        charts = [chart.strip() for chart in request.GET.get('charts', '').split(',') if chart.strip()]
+        comparison_data = cached_analytics.compare(filter_sets, charts)
+        return JsonResponse(comparison_data)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def cache_stats_api(request: HttpRequest) -> JsonResponse:
+    """Hit/miss, regeneration and payload counters per cache namespace, across workers"""
+    try:
+        return JsonResponse({
+            'namespaces': cache_stats.report(tiered_cache.namespaces()),
+            'local_cache': {
+                'entries': len(tiered_cache.local),
+                'max_entries': tiered_cache.local.max_entries,
+                'timeout': tiered_cache.local.timeout,
+            },
+            'timestamp': timezone.now().isoformat(),
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def top_favorites_etag(request: HttpRequest) -> str:
+    """ETag for the leaderboard: changes with any favorite or scene change"""
+    return _build_etag('top-favorites', request.GET.get('limit', ''), *cache_versions.get_many('scenes', 'favorites'))
+
+
+@etag_conditional(top_favorites_etag)
+def top_favorites_api(request: HttpRequest) -> JsonResponse:
+    """Most favorited scenes (id, title, fav_count) from the maintained leaderboard"""
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+    if limit < 1:
+        return JsonResponse({'error': 'limit must be at least 1'}, status=400)
+    
+    try:
+        scenes = analytics_aggregates.top_favorited(limit)
+        return JsonResponse({'scenes': scenes, 'count': len(scenes)})
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 class ScenePromptAPIView(APIView):
+    @method_decorator(etag_conditional(scene_content_etag))
     def get(self, request: HttpRequest, pk: int):
         scene = get_object_or_404(Scene, pk=pk)
         return Response({'full_text': scene.full_text})
@@ -350,24 +485,39 @@ class ScenePromptAPIView(APIView):
 
 class RandomSceneAPIView(APIView):
     def get(self, request: HttpRequest):
-        """Get a random scene via API"""
-        scene_ids = list(Scene.objects.values_list('id', flat=True))
-        if not scene_ids:
-            return Response({'error': 'No scenes available'}, status=404)
+        """
+        Get a random scene via API.
+        With ?count=N returns N distinct scenes in one response; country/setting/
+        emotion narrow the pool and weight=favorites favours popular scenes.
+        """
+        filters = {}
+        for facet in RANDOM_FACETS:
+            value = request.GET.get(facet)
+            if value and value != 'all':
+                filters[facet] = value
+        weighted = request.GET.get('weight') == 'favorites'
+        
+        if 'count' not in request.GET:
+            scene = random_scenes.random_scene(filters=filters, weighted=weighted)
+            if scene is None:
+                return Response({'error': 'No scenes available'}, status=404)
+            return Response(scene)
         
-        random_id = random.choice(scene_ids)
-        scene = Scene.objects.get(id=random_id)
+        try:
+            count = int(request.GET['count'])
+        except ValueError:
+            return Response({'error': 'count must be a number'}, status=400)
+        count = max(1, min(count, MAX_RANDOM_BATCH))
+        
+        scenes = random_scenes.random_batch(count, filters=filters, weighted=weighted)
+        if not scenes:
+            return Response({'error': 'No scenes available'}, status=404)
         
         return Response({
-            'id': scene.id,
-            'title': scene.title,
-            'effeminate_age': scene.effeminate_age,
-            'masculine_age': scene.masculine_age,
-            'country': scene.country,
-            'setting': scene.setting,
-            'emotion': scene.emotion,
-            'details': scene.details,
-            'full_text': scene.full_text
+            'scenes': scenes,
+            'count': len(scenes),
+            'filters': filters,
+            'weighted': weighted,
         })
 
 
@@ -390,10 +540,12 @@ def toggle_favorite(request: HttpRequest, pk: int) -> JsonResponse:
     if not created:
         # Already exists, so remove it
         favorite.delete()
+        session_favorites.remove(request, scene.id)
         is_favorited = False
         action = 'removed'
     else:
         # Just created, so it's now favorited
+        session_favorites.add(request, scene.id)
         is_favorited = True
         action = 'added'
     
@@ -556,10 +708,8 @@ def pagination_api(request: HttpRequest) -> JsonResponse:
         
         if favorites_only:
             # Show only favorite scenes for this session
-            favorite_scene_ids = FavoriteScene.objects.filter(
-                session_key=request.session.session_key
-            ).values_list('scene_id', flat=True)
-            scenes_qs = Scene.objects.filter(id__in=favorite_scene_ids)
+            user_favorites = session_favorites.for_request(request)
+            scenes_qs = Scene.objects.filter(id__in=user_favorites.ids)
         elif random_order:
             # Get all scene IDs and shuffle them
             scene_ids = list(Scene.objects.values_list('id', flat=True))
@@ -572,9 +722,8 @@ def pagination_api(request: HttpRequest) -> JsonResponse:
         else:
             scenes_qs = Scene.objects.all()
         
-
-        
-        paginator = Paginator(scenes_qs, page_size)
+        # Only counts and page numbers are returned, so no scene columns are needed
+        paginator = Paginator(scenes_qs.only('id'), page_size)
         
         # Handle invalid page numbers gracefully
         try:
@@ -604,12 +753,12 @@ def pagination_api(request: HttpRequest) -> JsonResponse:
             'total_items': paginator.count,
             'page_size': page_size,
             'page_range': page_range,
-            'has_previous': page_obj.has_previous,
-            'has_next': page_obj.has_next,
-            'previous_page_number': page_obj.previous_page_number if page_obj.has_previous else None,
-            'next_page_number': page_obj.next_page_number if page_obj.has_next else None,
-            'start_index': page_obj.start_index,
-            'end_index': page_obj.end_index,
+            'has_previous': page_obj.has_previous(),
+            'has_next': page_obj.has_next(),
+            'previous_page_number': page_obj.previous_page_number() if page_obj.has_previous() else None,
+            'next_page_number': page_obj.next_page_number() if page_obj.has_next() else None,
+            'start_index': page_obj.start_index(),
+            'end_index': page_obj.end_index(),
 
         })
         
@@ -617,6 +766,7 @@ def pagination_api(request: HttpRequest) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@etag_conditional(listing_etag)
 def favorites_list(request: HttpRequest) -> HttpResponse:
     """Show user's favorite scenes"""
     # Ensure session exists
@@ -631,22 +781,18 @@ def favorites_list(request: HttpRequest) -> HttpResponse:
         page_size = 10
     
     # Get favorite scenes for this session
-    favorite_scene_ids = FavoriteScene.objects.filter(
-        session_key=request.session.session_key
-    ).values_list('scene_id', flat=True)
+    user_favorites = session_favorites.for_request(request)
     
-    scenes_qs = Scene.objects.filter(id__in=favorite_scene_ids).order_by('-id')
+    scenes_qs = Scene.objects.filter(id__in=user_favorites.ids).order_by('-id')
     
-    paginator = Paginator(scenes_qs, page_size)
+    paginator = Paginator(card_queryset(scenes_qs), page_size)
     
     # Handle invalid page numbers gracefully
     try:
         page_obj: Page = paginator.get_page(page_number)
     except Exception:
         page_obj: Page = paginator.get_page(1)
-
-    # Get user's favorite scene IDs for this session
-    user_favorites = set(favorite_scene_ids)
+    paginate_cards(page_obj)
 
     # Calculate pagination range for numbered links
     current_page = page_obj.number
@@ -668,7 +814,7 @@ def favorites_list(request: HttpRequest) -> HttpResponse:
         'page_range': page_range,
         'page_size': page_size,
         'user_favorites': user_favorites,
-        'total_favorites': len(user_favorites),
+        'total_favorites': user_favorites.count,
         'is_favorites_page': True,
         'favorites_only': True,
     }
@@ -690,6 +836,7 @@ def favorites_list(request: HttpRequest) -> HttpResponse:
     return render(request, 'favorites_list.html', context)
 
 
+@etag_conditional(listing_etag)
 def search_results(request: HttpRequest) -> HttpResponse:
     """Simple search results page"""
     query = request.GET.get('q', '').strip()
@@ -715,7 +862,7 @@ def search_results(request: HttpRequest) -> HttpResponse:
         )
 
     # Get pagination
-    paginator = Paginator(scenes_qs, page_size)
+    paginator = Paginator(card_queryset(scenes_qs), page_size)
     try:
         page_obj = paginator.get_page(page_number)
         # Handle invalid page number - Redirect to last page
@@ -723,14 +870,13 @@ def search_results(request: HttpRequest) -> HttpResponse:
             page_obj = paginator.get_page(paginator.num_pages)
     except Exception:
         page_obj = paginator.get_page(1)
+    paginate_cards(page_obj)
 
     # Get user's favorite scene IDs for this session
     if not request.session.session_key:
         request.session.create()
     
-    user_favorites = set(FavoriteScene.objects.filter(
-        session_key=request.session.session_key
-    ).values_list('scene_id', flat=True))
+    user_favorites = session_favorites.for_request(request)
 
     # ADD PAGINATION RANGE CALCULATION (same as scene_list)
     current_page = page_obj.number
@@ -837,40 +983,46 @@ def upload_scene_images(request: HttpRequest, pk: int) -> JsonResponse:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@etag_conditional(scene_content_etag)
 def scene_images_api(request: HttpRequest, pk: int) -> JsonResponse:
     """Get all images for a scene"""
     scene = get_object_or_404(Scene, pk=pk)
+    total_images = 0
     
-    images = []
-    for img in scene.scene_images.all():
-        images.append({
-            'id': img.id,
-            'uuid': str(img.uuid),
-            'caption': img.caption,
-            'alt_text': img.alt_text,
-            'description': img.description,
-            'order': img.order,
-            'is_primary': img.is_primary,
-            'file_size': img.file_size_human,
-            'dimensions': f"{img.width}x{img.height}",
-            'aspect_ratio': img.aspect_ratio,
-            'uploaded_at': img.uploaded_at.isoformat(),
-            'urls': {
-                'original': img.get_image_url('original'),
-                'large': img.get_image_url('large'),
-                'medium': img.get_image_url('medium'),
-                'small': img.get_image_url('small'),
-                'thumbnail': img.get_image_url('thumbnail'),
+    def images():
+        nonlocal total_images
+        for img in scene.scene_images.all().iterator():
+            total_images += 1
+            yield {
+                'id': img.id,
+                'uuid': str(img.uuid),
+                'caption': img.caption,
+                'alt_text': img.alt_text,
+                'description': img.description,
+                'order': img.order,
+                'is_primary': img.is_primary,
+                'file_size': img.file_size_human,
+                'dimensions': f"{img.width}x{img.height}",
+                'aspect_ratio': img.aspect_ratio,
+                'uploaded_at': img.uploaded_at.isoformat(),
+                'urls': {
+                    'original': img.get_image_url('original'),
+                    'large': img.get_image_url('large'),
+                    'medium': img.get_image_url('medium'),
+                    'small': img.get_image_url('small'),
+                    'thumbnail': img.get_image_url('thumbnail'),
+                }
             }
-        })
     
-    return JsonResponse({
-        'success': True,
-        'scene_id': scene.id,
-        'scene_title': scene.title,
-        'images': images,
-        'total_images': len(images)
-    })
+    def sections():
+        yield 'success', True
+        yield 'scene_id', scene.id
+        yield 'scene_title', scene.title
+        # Images are read and encoded one at a time; the total is known once they are out
+        yield 'images', images()
+        yield 'total_images', total_images
+    
+    return json_sections_response(sections())
 
 
 @csrf_exempt
@@ -900,6 +1052,9 @@ def update_image_order(request: HttpRequest, pk: int) -> JsonResponse:
                     scene=scene
                 ).update(order=new_order)
         
+        # Bulk updates skip the post_save signal, so advance the ETag version here
+        cache_versions.bump('scenes')
+        
         return JsonResponse({
             'success': True,
             'message': 'Image order updated successfully'
@@ -1247,60 +1402,76 @@ def search_api(request: HttpRequest) -> JsonResponse:
                 results_count=0  # Will be updated below
             )
         
-        # Start with all scenes
-        scenes_qs = Scene.objects.all()
+        # Results are cached per query and page; the generation moves on scene/favorite changes
+        cache_key = cache_keys.key('search.results', q=query.lower(), page=page, page_size=page_size)
+        results = tiered_cache.get(cache_key)
         
-        # Apply search query if provided
-        if query:
-            scenes_qs = scenes_qs.filter(
-                Q(title__icontains=query) |
-                Q(country__icontains=query) |
-                Q(setting__icontains=query) |
-                Q(emotion__icontains=query) |
-                Q(full_text__icontains=query)
-            )
+        if results is None:
+            started = time.perf_counter()
+            # Start with all scenes
+            scenes_qs = Scene.objects.all()
+            
+            # Apply search query if provided
+            if query:
+                scenes_qs = scenes_qs.filter(
+                    Q(title__icontains=query) |
+                    Q(country__icontains=query) |
+                    Q(setting__icontains=query) |
+                    Q(emotion__icontains=query) |
+                    Q(full_text__icontains=query)
+                )
+            
+            # Order by most recent first
+            scenes_qs = scenes_qs.order_by('-id')
+            
+            # Pagination (favorite counts come from the same query)
+            paginator = Paginator(card_queryset(scenes_qs, details=False, favorite_count=True), page_size)
+            page_obj = paginator.get_page(page)
+            paginate_cards(page_obj, images=False)
+            
+            # Serialize scenes
+            scenes_data = []
+            for scene in page_obj:
+                scenes_data.append({
+                    'id': scene.id,
+                    'title': scene.title,
+                    'country': scene.country,
+                    'setting': scene.setting,
+                    'emotion': scene.emotion,
+                    'effeminate_age': scene.effeminate_age,
+                    'masculine_age': scene.masculine_age,
+                    'favorite_count': scene.favorite_count
+                })
             
+            results = {
+                'scenes': scenes_data,
+                'pagination': {
+                    'current_page': page_obj.number,
+                    'total_pages': paginator.num_pages,
+                    'total_items': paginator.count,
+                    'has_previous': page_obj.has_previous(),
+                    'has_next': page_obj.has_next(),
+                    'page_size': page_size
+                },
+            }
+            cache_stats.record(search_cache.name, 'regenerations')
+            cache_stats.record(search_cache.name, 'regeneration_ms', round((time.perf_counter() - started) * 1000))
+            tiered_cache.set(cache_key, results, search_cache.timeout)
+        
+        if query:
             # Update search suggestions
             SearchSuggestion.add_or_update_suggestion(query, 'content')
         
-        # Order by most recent first
-        scenes_qs = scenes_qs.order_by('-id')
-        
-        # Pagination
-        paginator = Paginator(scenes_qs, page_size)
-        page_obj = paginator.get_page(page)
-        
         # Update search query results count
         if query and request.session.session_key:
             SearchQuery.objects.filter(
                 query=query,
                 session_key=request.session.session_key
-            ).update(results_count=paginator.count)
-        
-        # Serialize scenes
-        scenes_data = []
-        for scene in page_obj:
-            scenes_data.append({
-                'id': scene.id,
-                'title': scene.title,
-                'country': scene.country,
-                'setting': scene.setting,
-                'emotion': scene.emotion,
-                'effeminate_age': scene.effeminate_age,
-                'masculine_age': scene.masculine_age,
-                'favorite_count': scene.favorite_count
-            })
+            ).update(results_count=results['pagination']['total_items'])
         
         return JsonResponse({
-            'scenes': scenes_data,
-            'pagination': {
-                'current_page': page_obj.number,
-                'total_pages': paginator.num_pages,
-                'total_items': paginator.count,
-                'has_previous': page_obj.has_previous,
-                'has_next': page_obj.has_next,
-                'page_size': page_size
-            },
+            'scenes': results['scenes'],
+            'pagination': results['pagination'],
             'query': query
         })
         
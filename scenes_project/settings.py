@@ -130,8 +130,9 @@ CACHES = {
                 'max_connections': 20,
                 'retry_on_timeout': True,
             },
-            'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
-            'SERIALIZER': 'django_redis.serializers.json.JSONSerializer',
+            # cache_codec compresses on its own (lz4 or zlib), see CACHE_CODEC below
+            'COMPRESSOR': 'django_redis.compressors.identity.IdentityCompressor',
+            'SERIALIZER': 'scenes_project.scenes_app.utils.cache_codec.CodecSerializer',
         },
         'KEY_PREFIX': 'scenes_analytics',
         'TIMEOUT': 1800,  # 30 minutes default
@@ -142,12 +143,54 @@ CACHES = {
 ANALYTICS_CACHE_TIMEOUTS = {
     'full_analytics': 1800,      # 30 minutes - full analytics data
     'filtered_analytics': 900,   # 15 minutes - filtered results
+    'comparison': 900,           # 15 minutes - batch comparisons
     'field_distributions': 600,  # 10 minutes - country/setting/emotion data
     'age_ranges': 1200,         # 20 minutes - age range calculations
     'details_analysis': 1800,   # 30 minutes - appearance/hair/clothing
     'sync_check': 300,          # 5 minutes - database sync status
 }
 
+# Soft expiry: older payloads are served as-is and refreshed in the background
+ANALYTICS_CACHE_SOFT_TIMEOUTS = {
+    'full_analytics': 60,        # 1 minute - keeps activity and sync info current
+    'filtered_analytics': 300,   # 5 minutes - hard expiry stays at 15 minutes
+}
+
+# Scenes listed in the analytics most_favorited section (favorites_limit=all lists every one)
+ANALYTICS_MOST_FAVORITED_LIMIT = 10
+
+# Per-session favorite id sets (kept current by toggle_favorite)
+FAVORITES_CACHE_TIMEOUT = 300  # 5 minutes
+
+# Generation-namespaced search results and plain listing pages
+SEARCH_CACHE_TIMEOUT = 300   # 5 minutes
+LISTING_CACHE_TIMEOUT = 600  # 10 minutes
+
+# Hourly favorite/search rollups older than this are dropped by compact_activity
+ACTIVITY_HOURLY_RETENTION_DAYS = 7
+
+# Per-worker L1 in front of Redis for the analytics and listing namespaces
+LOCAL_CACHE_MAX_ENTRIES = 256
+LOCAL_CACHE_TIMEOUT = 60  # 1 minute
+
+# Seconds between flushes of per-worker cache counters to Redis (see cache_stats)
+CACHE_STATS_FLUSH_INTERVAL = 10
+
+# Filter combinations computed at once by manage_analytics_cache --warm --all-filters
+ANALYTICS_WARM_CONCURRENCY = 4
+
+# Encoding of cached values: 'auto' picks orjson, then msgpack, then json, and
+# lz4, then zlib, from what is installed (benchmark_cache_codec compares them).
+# orjson is in requirements.txt; msgpack and lz4 are optional extras, so a
+# default install uses orjson+zlib
+CACHE_CODEC = 'auto'
+CACHE_COMPRESSION = 'auto'
+CACHE_COMPRESSION_LEVEL = 6  # zlib; 1 encodes ~2x faster but stores 12-24% more bytes
+CACHE_COMPRESSION_MIN_LENGTH = 512  # bytes; shorter values are stored uncompressed
+
+# Stream JSON API responses built from lazily read rows (scene images) section by section
+STREAMING_JSON_RESPONSES = True
+
 # Session configuration (optional - for better session management)
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'